@@ -0,0 +1,75 @@
+"""
+Renderer Kernels - Numeric helpers shared by the video renderers
+Compiled with Numba when it is installed (cached to __pycache__, so only the
+first run pays the JIT cost); plain NumPy/Python otherwise.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def build_gradient(height: int, width: int, base: int, spread: int) -> np.ndarray:
+    """Build a grey vertical gradient from `base` to `base + spread` as an RGB array."""
+    step = spread / height
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    for y in range(height):
+        out[y, :, :] = np.uint8(base + y * step)
+    return out
+
+
+def wrap_breaks(word_widths: np.ndarray, space_width: float, max_width: float) -> np.ndarray:
+    """Return the indices of the words that start a new wrapped line."""
+    starts = np.empty(word_widths.shape[0], dtype=np.int64)
+    n = 0
+    line_width = -1.0  # Negative while the current line is still empty
+    for i in range(word_widths.shape[0]):
+        width = word_widths[i]
+        test_width = width if line_width < 0 else line_width + space_width + width
+        if test_width < max_width:
+            line_width = test_width
+        else:
+            if line_width >= 0:
+                starts[n] = i
+                n += 1
+            line_width = width
+    return starts[:n]
+
+
+def interp_indices(n: int, bounds: np.ndarray) -> np.ndarray:
+    """Map n evenly spaced progress values in [0, 1] to step-function segment indices."""
+    # Divide like the scalar i / (n - 1) loop (linspace's stepped values can land just past
+    # a bound); side='left' then keeps a progress equal to a bound in the lower segment
+    progresses = np.arange(n) / max(n - 1, 1)
+    return np.searchsorted(bounds, progresses)
+
+
+def blend_row_colors(region: np.ndarray, rows: np.ndarray, alpha: int):
+    """Blend one solid color per row into an RGB region in place, at a flat 0-255 alpha."""
+    src = rows[:, None, :3].astype(np.int32) * alpha + 127
+    region[:, :, :3] = (region[:, :, :3].astype(np.int32) * (255 - alpha) + src) // 255
+
+
+def _blend_row_colors_loops(region, rows, alpha):
+    # Scalar-loop form of blend_row_colors for Numba: no temporaries, unit-stride inner loop
+    inv = 255 - alpha
+    for y in range(region.shape[0]):
+        r = np.int32(rows[y, 0]) * alpha + 127
+        g = np.int32(rows[y, 1]) * alpha + 127
+        b = np.int32(rows[y, 2]) * alpha + 127
+        for x in range(region.shape[1]):
+            region[y, x, 0] = (np.int32(region[y, x, 0]) * inv + r) // 255
+            region[y, x, 1] = (np.int32(region[y, x, 1]) * inv + g) // 255
+            region[y, x, 2] = (np.int32(region[y, x, 2]) * inv + b) // 255
+
+if NUMBA_AVAILABLE:
+    build_gradient = njit(cache=True)(build_gradient)
+    wrap_breaks = njit(cache=True)(wrap_breaks)
+    interp_indices = njit(cache=True)(interp_indices)
+    # Eagerly compiled for the exact C-contiguous uint8 layout the premium renderer passes,
+    # so the compile happens once at import and LLVM can vectorize the unit-stride rows
+    blend_row_colors = njit('void(uint8[:, :, ::1], uint8[:, ::1], int64)', cache=True)(_blend_row_colors_loops)
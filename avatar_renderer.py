@@ -77,11 +77,12 @@ class AvatarVideoRenderer:
             from semantic_animator import SemanticAnimator
             animator = SemanticAnimator(self.width, self.height, self.fps)
             triggers = animator.analyze_narration(narration_text, duration)
+            animator.prewarm(triggers)
             
-            # Apply animations to each frame
+            # Apply animations to each frame; every frame is freshly drawn, so paste in place
             for i, frame in enumerate(frames):
                 time = i * frame_duration
-                frame = animator.apply_animations_to_frame(frame, triggers, time)
+                frame = animator.apply_animations_to_frame(frame, triggers, time, in_place=True)
                 frames[i] = frame
                 
         except Exception as e:
@@ -5,15 +5,61 @@ Creates engaging videos with emojis, animations, and visual effects while mainta
 
 import os
 import json
+import functools
 import subprocess
 import tempfile
 import math
 import random
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _render_bg_particles(buf, px, py, psize, pglow, stamps, W, H, t):
+        """Fill the animated background and particle glows in one pass, like the PIL path."""
+        half = (stamps.shape[1] - 1) // 2
+        for y in prange(H):
+            # Animated gradient row
+            base = 30 + int(20 * math.sin(t * 0.5 + y * 0.01))
+            for x in range(W):
+                buf[y, x, 0] = base
+                buf[y, x, 1] = base + 10
+                buf[y, x, 2] = base + 20
+            
+            # Particles, later ones on top; each stamp pixel holds the offset of the
+            # largest (last drawn) glow ellipse covering it, or -1
+            for k in range(px.shape[0]):
+                dy = y - py[k]
+                if abs(dy) > half:
+                    continue
+                stamp = stamps[psize[k], dy + half]
+                for sx in range(stamp.shape[0]):
+                    offset = stamp[sx]
+                    x = px[k] + sx - half
+                    if offset >= 0 and 0 <= x < W:
+                        for c in range(3):
+                            buf[y, x, c] = pglow[k, offset, c]
+
+
+@functools.lru_cache(maxsize=64)
+def _probe_audio_duration(audio_path: str, mtime: float) -> float:
+    """Run ffprobe once per (path, modification time) and return the duration."""
+    result = subprocess.run([
+        'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
+        '-of', 'csv=p=0', audio_path
+    ], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
 class FastEngagingVideoRenderer:
     """Fast video renderer with engaging animations and emojis."""
     
@@ -36,6 +82,27 @@ class FastEngagingVideoRenderer:
         
         # Animation particles
         self.particles = []
+        self.particle_colors = [(100, 150, 255), (255, 100, 150), (100, 255, 150), (255, 200, 100)]
+        self.particle_max_size = 6
+        self._glow_lut = {}
+        
+        # Per-section render caches, reset whenever the section changes
+        self._section = None
+        self._code_layer = None
+        self._code_line_count = 0
+        self._fonts = {}
+        
+        # Line-number labels and their real advance widths, measured once
+        self._line_num_strs = [f"{i+1:2d} " for i in range(12)]
+        code_font = self._get_font("/System/Library/Fonts/Menlo.ttc", 28)
+        intro_font = self._get_font("/System/Library/Fonts/Menlo.ttc", 32)
+        self._line_num_widths = [int(code_font.getlength(s)) for s in self._line_num_strs]
+        self._intro_line_num_widths = [int(intro_font.getlength(s)) for s in self._line_num_strs[:8]]
+        
+        # Reusable frame canvas; every frame fully repaints the background
+        self._canvas = Image.new('RGB', (self.width, self.height))
+        self._canvas_draw = ImageDraw.Draw(self._canvas)
+        self._frame_buf = np.empty((self.height, self.width, 3), dtype=np.uint8)
         
     def create_animated_video(self, code: str, audio_path: str, explanation: Dict[str, Any],
                             output_path: str = "fast_engaging_video.mp4", narration_text: str = None) -> str:
@@ -48,10 +115,10 @@ class FastEngagingVideoRenderer:
         total_frames = int(duration * self.fps)
         frame_duration = duration / total_frames
         
-        # Create frames with animations
+        # Create frames with animations (generated lazily on a shared canvas)
         frames = self._create_animated_frames(code, explanation, total_frames, duration)
         
-        # Save frames as images
+        # Save each frame as soon as it is rendered
         frame_dir = tempfile.mkdtemp()
         frame_paths = []
         
@@ -71,23 +138,23 @@ class FastEngagingVideoRenderer:
         return output_path
     
     def _get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration using ffprobe."""
+        """Get audio duration using ffprobe (cached per file)."""
         try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-                '-of', 'csv=p=0', audio_path
-            ], capture_output=True, text=True)
-            return float(result.stdout.strip())
-        except:
+            return _probe_audio_duration(audio_path, os.path.getmtime(audio_path))
+        except (subprocess.CalledProcessError, ValueError, FileNotFoundError) as e:
+            print(f"⚠️ Could not read audio duration for {audio_path}: {e}")
             return 10.0  # Default duration
     
     def _create_animated_frames(self, code: str, explanation: Dict[str, Any], 
-                              total_frames: int, duration: float) -> List[Image.Image]:
-        """Create animated frames with emojis and effects."""
-        frames = []
+                              total_frames: int, duration: float) -> Iterator[Image.Image]:
+        """Yield animated frames with emojis and effects.
         
+        Every yielded frame is the same reused canvas, so it must be consumed
+        (saved or encoded) before the next one is requested.
+        """
         # Initialize particles
         self._init_particles()
+        self._section = None
         
         for i in range(total_frames):
             progress = i / (total_frames - 1)
@@ -95,12 +162,10 @@ class FastEngagingVideoRenderer:
             
             # Create frame with animations
             frame = self._create_animated_frame(code, explanation, progress, time, i)
-            frames.append(frame)
+            yield frame
             
             # Update particles
             self._update_particles()
-        
-        return frames
     
     def _init_particles(self):
         """Initialize floating particles."""
@@ -111,9 +176,42 @@ class FastEngagingVideoRenderer:
                 'y': random.randint(0, self.height),
                 'vx': random.uniform(-1, 1),
                 'vy': random.uniform(-1, 1),
-                'size': random.randint(2, 6),
-                'color': random.choice([(100, 150, 255), (255, 100, 150), (100, 255, 150), (255, 200, 100)])
+                'size': random.randint(2, self.particle_max_size),
+                'color': random.choice(self.particle_colors)
             })
+        
+        # Precompute glow colors: lut[color][size][offset] = color * (1 - offset / size)
+        sizes = np.arange(1, self.particle_max_size + 1)[:, None]
+        offsets = np.arange(self.particle_max_size)[None, :]
+        alphas = np.clip(1 - offsets / sizes, 0, 1)
+        self._glow_lut = {}
+        self._glow_table = {}
+        for color in self.particle_colors:
+            lut = (alphas[:, :, None] * np.array(color)[None, None, :]).astype(np.uint8)
+            # Prepend size 0 so the table can be indexed by size directly
+            self._glow_lut[color] = [[]] + [[tuple(c) for c in row] for row in lut.tolist()]
+            self._glow_table[color] = np.concatenate([np.zeros_like(lut[:1]), lut])
+        
+        if NUMBA_AVAILABLE:
+            self._glow_stamps = self._build_glow_stamps()
+    
+    def _build_glow_stamps(self) -> np.ndarray:
+        """Rasterize each particle size's glow ellipses once, exactly as _draw_particles does.
+        
+        stamps[size][y][x] is the offset of the last ellipse drawn over that pixel
+        (the one whose color shows), or -1 where no ellipse reaches.
+        """
+        half = self.particle_max_size - 1
+        side = 2 * half + 1
+        stamps = np.full((self.particle_max_size + 1, side, side), -1, dtype=np.int64)
+        for size in range(1, self.particle_max_size + 1):
+            mask = Image.new('L', (side, side), 0)
+            mask_draw = ImageDraw.Draw(mask)
+            for offset in range(size):
+                mask_draw.ellipse([half - offset, half - offset, half + offset, half + offset],
+                                  fill=offset + 1)
+            stamps[size] = np.asarray(mask, dtype=np.int64) - 1
+        return stamps
     
     def _update_particles(self):
         """Update particle positions."""
@@ -130,18 +228,30 @@ class FastEngagingVideoRenderer:
     def _create_animated_frame(self, code: str, explanation: Dict[str, Any], 
                              progress: float, time: float, frame_num: int) -> Image.Image:
         """Create a single animated frame."""
-        # Create base image with gradient background
-        img = Image.new('RGB', (self.width, self.height), color=(30, 30, 30))
-        draw = ImageDraw.Draw(img)
-        
-        # Animated gradient background
-        self._draw_animated_background(draw, progress, time)
-        
-        # Draw floating particles
-        self._draw_particles(draw)
+        if NUMBA_AVAILABLE:
+            # Background and particles are pure pixel math: fill them in one
+            # compiled pass and only rasterize text and the border with PIL on top
+            buf = self._frame_buf
+            _render_bg_particles(buf, *self._particle_arrays(), self._glow_stamps,
+                                 self.width, self.height, time)
+            img = self._canvas
+            img.frombytes(buf)
+            draw = self._canvas_draw
+        else:
+            # Reuse the canvas; the gradient background overwrites every row
+            img = self._canvas
+            draw = self._canvas_draw
+            
+            # Animated gradient background
+            self._draw_animated_background(draw, progress, time)
+            
+            # Draw floating particles
+            self._draw_particles(draw)
         
         # Determine current section based on progress
         section = self._get_current_section(progress, time)
+        if section != self._section:
+            self._enter_section(section, explanation)
         
         # Draw content based on section
         if section == 'title':
@@ -149,7 +259,7 @@ class FastEngagingVideoRenderer:
         elif section == 'code_intro':
             self._draw_code_intro(draw, code, progress, time)
         elif section == 'code_detail':
-            self._draw_animated_code(draw, code, progress, time)
+            self._draw_animated_code(img, draw, code, progress, time)
         elif section == 'explanation':
             self._draw_animated_explanation(draw, explanation, progress, time)
         else:  # summary
@@ -160,6 +270,15 @@ class FastEngagingVideoRenderer:
         
         return img
     
+    def _particle_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Pack particle state and glow colors into flat arrays for the compiled kernel."""
+        px = np.array([int(p['x']) for p in self.particles], dtype=np.int64)
+        py = np.array([int(p['y']) for p in self.particles], dtype=np.int64)
+        psize = np.array([p['size'] for p in self.particles], dtype=np.int64)
+        pglow = np.array([self._glow_table[p['color']][p['size']] for p in self.particles],
+                         dtype=np.uint8).reshape(-1, self.particle_max_size, 3)
+        return px, py, psize, pglow
+    
     def _draw_animated_background(self, draw: ImageDraw.Draw, progress: float, time: float):
         """Draw animated gradient background."""
         for y in range(self.height):
@@ -176,9 +295,9 @@ class FastEngagingVideoRenderer:
             color = particle['color']
             
             # Draw particle with glow effect
+            glow_colors = self._glow_lut[color][size]
             for offset in range(size):
-                alpha = 1 - (offset / size)
-                glow_color = tuple(int(c * alpha) for c in color)
+                glow_color = glow_colors[offset]
                 draw.ellipse([x - offset, y - offset, x + offset, y + offset], 
                            fill=glow_color)
     
@@ -195,25 +314,58 @@ class FastEngagingVideoRenderer:
         else:
             return 'summary'
     
+    def _get_font(self, path: str, size: int) -> ImageFont.ImageFont:
+        """Load a font once and reuse it for every subsequent frame."""
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            try:
+                font = ImageFont.truetype(path, size)
+            except:
+                font = ImageFont.load_default()
+            self._fonts[key] = font
+        return font
+    
+    def _enter_section(self, section: str, explanation: Dict[str, Any]):
+        """Reset per-section render caches and precompute the section's strings."""
+        self._section = section
+        self._code_layer = None
+        self._cached_intro_emojis = [random.choice(self.emojis['code']) for _ in range(8)]
+        
+        if section == 'title':
+            emoji = random.choice(self.emojis['code'])
+            title = explanation.get('title', 'Code Explanation')
+            self._cached_title = f"{emoji} {title} {emoji}"
+            self._cached_floating_emojis = [random.choice(self.emojis['default']) for _ in range(3)]
+        elif section == 'explanation':
+            emoji = random.choice(self.emojis['code'])
+            self._cached_title_explanation = f"{emoji} Explanation {emoji}"
+            words = explanation.get('overview', 'Code explanation').split()
+            self._cached_explanation_words = [
+                f"{word} {random.choice(self.emojis['default'])}" if i % 3 == 0 else word
+                for i, word in enumerate(words)
+            ]
+        elif section == 'summary':
+            emoji = random.choice(self.emojis['success'])
+            self._cached_title_summary = f"{emoji} Success! {emoji}"
+            takeaways = explanation.get('key_takeaways', ['Code explanation completed!'])
+            self._cached_takeaways = [
+                f"{random.choice(self.emojis['success'])} {takeaway}" for takeaway in takeaways[:3]
+            ]
+            self._cached_celebration_emojis = [random.choice(self.emojis['success']) for _ in range(5)]
+    
     def _draw_animated_title(self, draw: ImageDraw.Draw, explanation: Dict[str, Any], 
                            progress: float, time: float):
         """Draw animated title with emojis."""
-        try:
-            font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 72)
-            font_emoji = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-        except:
-            font_large = ImageFont.load_default()
-            font_emoji = ImageFont.load_default()
-        
-        title = explanation.get('title', 'Code Explanation')
+        font_large = self._get_font("/System/Library/Fonts/Arial.ttf", 72)
+        font_emoji = self._get_font("/System/Library/Fonts/Arial.ttf", 48)
         
         # Animated title with bounce effect
         bounce = math.sin(time * 3) * 5
         title_y = 200 + bounce
         
         # Title with emoji
-        emoji = random.choice(self.emojis['code'])
-        full_title = f"{emoji} {title} {emoji}"
+        full_title = self._cached_title
         
         # Glow effect
         for offset in range(5):
@@ -227,21 +379,15 @@ class FastEngagingVideoRenderer:
                  fill=(255, 255, 255), font=font_large)
         
         # Floating emojis
-        for i in range(3):
+        for i, floating_emoji in enumerate(self._cached_floating_emojis):
             emoji_x = 100 + i * 200 + math.sin(time * 2 + i) * 50
             emoji_y = 400 + math.cos(time * 1.5 + i) * 30
-            floating_emoji = random.choice(self.emojis['default'])
             draw.text((emoji_x, emoji_y), floating_emoji, 
                      fill=(255, 200, 100), font=font_emoji)
     
     def _draw_code_intro(self, draw: ImageDraw.Draw, code: str, progress: float, time: float):
         """Draw animated code introduction."""
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", 32)
-            font_emoji = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-        except:
-            font = ImageFont.load_default()
-            font_emoji = ImageFont.load_default()
+        font = self._get_font("/System/Library/Fonts/Menlo.ttc", 32)
         
         # Animated code box
         box_alpha = min(1.0, progress * 5)  # Fade in
@@ -260,9 +406,8 @@ class FastEngagingVideoRenderer:
             line_alpha = min(1.0, (progress - i * 0.1) * 3)
             if line_alpha > 0:
                 # Line number with emoji
-                line_num = f"{i+1:2d} "
-                emoji = random.choice(self.emojis['code'])
-                line_with_emoji = f"{emoji} {line}"
+                line_num = self._line_num_strs[i]
+                line_with_emoji = f"{self._cached_intro_emojis[i]} {line}"
                 
                 # Animated position
                 line_x = 70 + int(10 * math.sin(time + i))
@@ -270,34 +415,57 @@ class FastEngagingVideoRenderer:
                 # Draw line
                 color = tuple(int(c * line_alpha) for c in (255, 255, 255))
                 draw.text((line_x, y_pos), line_num, fill=(100, 100, 100), font=font)
-                draw.text((line_x + len(line_num) * 15, y_pos), line_with_emoji, 
+                draw.text((line_x + self._intro_line_num_widths[i], y_pos), line_with_emoji, 
                          fill=color, font=font)
                 
                 y_pos += 40
     
-    def _draw_animated_code(self, draw: ImageDraw.Draw, code: str, progress: float, time: float):
+    def _draw_animated_code(self, img: Image.Image, draw: ImageDraw.Draw, code: str,
+                            progress: float, time: float):
         """Draw animated code with syntax highlighting and emojis."""
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", 28)
-            font_emoji = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 20)
-        except:
-            font = ImageFont.load_default()
-            font_emoji = ImageFont.load_default()
-        
         # Code area
         draw.rectangle([50, 100, self.width - 50, self.height - 100], 
                       fill=(45, 45, 48), outline=(80, 80, 80), width=3)
         
-        lines = code.strip().split('\n')
+        # Line text only changes between sections, so rasterize it once
+        if self._code_layer is None:
+            self._code_layer = self._build_code_layer(code)
+        
         y_pos = 150
         
-        for i, line in enumerate(lines[:12]):
+        for i, (sprite, text_width) in enumerate(self._code_layer):
             # Animated highlighting
             highlight_alpha = 0.5 + 0.5 * math.sin(time * 2 + i)
             
+            # Animated position
+            line_x = 70 + int(5 * math.sin(time + i * 0.5))
+            img.paste(sprite, (line_x, y_pos), sprite)
+            
+            # Highlight current line
+            if i == int(time * 2) % self._code_line_count:
+                highlight_rect = [line_x - 10, y_pos - 5, 
+                                line_x + text_width + 10, y_pos + 30]
+                highlight_color = (int(255 * highlight_alpha), 
+                                 int(200 * highlight_alpha), 
+                                 int(100 * highlight_alpha))
+                draw.rectangle(highlight_rect, fill=highlight_color, outline=(255, 200, 100))
+            
+            y_pos += 35
+    
+    def _build_code_layer(self, code: str) -> List[Tuple[Image.Image, int]]:
+        """Rasterize line numbers, emojis and code text into one RGBA sprite per line."""
+        font = self._get_font("/System/Library/Fonts/Menlo.ttc", 28)
+        font_emoji = self._get_font("/System/Library/Fonts/Arial.ttf", 20)
+        
+        lines = code.strip().split('\n')
+        self._code_line_count = len(lines)
+        sprite_width = self.width - 120
+        layer = []
+        
+        for i, line in enumerate(lines[:12]):
             # Line number with emoji
-            line_num = f"{i+1:2d} "
-            emoji = self._get_line_emoji(line)
+            line_num = self._line_num_strs[i]
+            num_width = self._line_num_widths[i]
             
             # Syntax highlighting with emojis
             if 'def ' in line:
@@ -319,26 +487,16 @@ class FastEngagingVideoRenderer:
                 color = (255, 255, 255)  # White for regular code
                 emoji = random.choice(self.emojis['default'])
             
-            # Animated position
-            line_x = 70 + int(5 * math.sin(time + i * 0.5))
-            
-            # Draw line with emoji
-            draw.text((line_x, y_pos), line_num, fill=(100, 100, 100), font=font)
-            draw.text((line_x + len(line_num) * 15, y_pos), emoji, 
-                     fill=(255, 200, 100), font=font_emoji)
-            draw.text((line_x + len(line_num) * 15 + 25, y_pos), line, 
-                     fill=color, font=font)
-            
-            # Highlight current line
-            if i == int(time * 2) % len(lines):
-                highlight_rect = [line_x - 10, y_pos - 5, 
-                                line_x + len(line) * 15 + 50, y_pos + 30]
-                highlight_color = (int(255 * highlight_alpha), 
-                                 int(200 * highlight_alpha), 
-                                 int(100 * highlight_alpha))
-                draw.rectangle(highlight_rect, fill=highlight_color, outline=(255, 200, 100))
-            
-            y_pos += 35
+            sprite = Image.new('RGBA', (sprite_width, 40), (0, 0, 0, 0))
+            sprite_draw = ImageDraw.Draw(sprite)
+            sprite_draw.text((0, 0), line_num, fill=(100, 100, 100), font=font)
+            sprite_draw.text((num_width, 0), emoji, 
+                           fill=(255, 200, 100), font=font_emoji)
+            sprite_draw.text((num_width + 25, 0), line, 
+                           fill=color, font=font)
+            layer.append((sprite, num_width + 25 + int(font.getlength(line))))
+        
+        return layer
     
     def _get_line_emoji(self, line: str) -> str:
         """Get appropriate emoji for a code line."""
@@ -358,38 +516,17 @@ class FastEngagingVideoRenderer:
     def _draw_animated_explanation(self, draw: ImageDraw.Draw, explanation: Dict[str, Any], 
                                  progress: float, time: float):
         """Draw animated explanation with emojis."""
-        try:
-            font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-            font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 32)
-            font_emoji = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 36)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_emoji = ImageFont.load_default()
-        
-        # Title with emoji
-        title = "Explanation"
-        emoji = random.choice(self.emojis['code'])
-        full_title = f"{emoji} {title} {emoji}"
+        font_large = self._get_font("/System/Library/Fonts/Arial.ttf", 48)
+        font_small = self._get_font("/System/Library/Fonts/Arial.ttf", 32)
         
         # Animated title
         title_y = 100 + int(10 * math.sin(time * 2))
-        draw.text((self.width//2 - 200, title_y), full_title, 
+        draw.text((self.width//2 - 200, title_y), self._cached_title_explanation, 
                  fill=(255, 255, 255), font=font_large)
         
         # Explanation text with emojis
-        explanation_text = explanation.get('overview', 'Code explanation')
-        words = explanation_text.split()
-        
         y_pos = 200
-        for i, word in enumerate(words):
-            # Add emoji every few words
-            if i % 3 == 0:
-                word_emoji = random.choice(self.emojis['default'])
-                word_with_emoji = f"{word} {word_emoji}"
-            else:
-                word_with_emoji = word
-            
+        for i, word_with_emoji in enumerate(self._cached_explanation_words):
             # Animated position
             word_x = 100 + i * 50 + int(10 * math.sin(time + i * 0.5))
             
@@ -406,34 +543,20 @@ class FastEngagingVideoRenderer:
     def _draw_animated_summary(self, draw: ImageDraw.Draw, explanation: Dict[str, Any], 
                              progress: float, time: float):
         """Draw animated summary with success emojis."""
-        try:
-            font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 64)
-            font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 36)
-            font_emoji = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_emoji = ImageFont.load_default()
-        
-        # Success title with emojis
-        title = "Success!"
-        emoji = random.choice(self.emojis['success'])
-        full_title = f"{emoji} {title} {emoji}"
+        font_large = self._get_font("/System/Library/Fonts/Arial.ttf", 64)
+        font_small = self._get_font("/System/Library/Fonts/Arial.ttf", 36)
+        font_emoji = self._get_font("/System/Library/Fonts/Arial.ttf", 48)
         
         # Bouncing title
         bounce = math.sin(time * 4) * 10
         title_y = 150 + bounce
-        draw.text((self.width//2 - 200, title_y), full_title, 
+        draw.text((self.width//2 - 200, title_y), self._cached_title_summary, 
                  fill=(100, 255, 100), font=font_large)
         
         # Key takeaways with emojis
-        takeaways = explanation.get('key_takeaways', ['Code explanation completed!'])
         y_pos = 300
         
-        for i, takeaway in enumerate(takeaways[:3]):
-            takeaway_emoji = random.choice(self.emojis['success'])
-            takeaway_with_emoji = f"{takeaway_emoji} {takeaway}"
-            
+        for i, takeaway_with_emoji in enumerate(self._cached_takeaways):
             # Animated position
             takeaway_x = 200 + int(20 * math.sin(time + i))
             
@@ -447,27 +570,28 @@ class FastEngagingVideoRenderer:
             y_pos += 80
         
         # Celebration emojis
-        for i in range(5):
+        for i, celebration_emoji in enumerate(self._cached_celebration_emojis):
             emoji_x = 100 + i * 200 + math.sin(time * 2 + i) * 30
             emoji_y = 600 + math.cos(time * 1.5 + i) * 20
-            celebration_emoji = random.choice(self.emojis['success'])
             draw.text((emoji_x, emoji_y), celebration_emoji, 
                      fill=(255, 200, 100), font=font_emoji)
     
-    def _draw_animated_border(self, draw: ImageDraw.Draw, progress: float, time: float):
-        """Draw animated border."""
-        # Animated border color
-        border_color = (
+    def _border_color(self, time: float) -> Tuple[int, int, int]:
+        """Animated border color."""
+        return (
             int(100 + 50 * math.sin(time)),
             int(150 + 50 * math.cos(time)),
             int(200 + 50 * math.sin(time * 0.5))
         )
-        
-        # Animated border thickness
-        border_width = 2 + int(2 * math.sin(time * 3))
-        
+    
+    def _border_width(self, time: float) -> int:
+        """Animated border thickness."""
+        return 2 + int(2 * math.sin(time * 3))
+    
+    def _draw_animated_border(self, draw: ImageDraw.Draw, progress: float, time: float):
+        """Draw animated border."""
         draw.rectangle([20, 20, self.width - 20, self.height - 20], 
-                      outline=border_color, width=border_width)
+                      outline=self._border_color(time), width=self._border_width(time))
     
     def _create_video_from_frames(self, frame_paths: List[str], audio_path: str, 
                                 output_path: str, duration: float, frame_duration: float):
@@ -3,28 +3,87 @@ Lightweight Video Renderer - Memory efficient and fast
 Creates engaging videos with minimal resource usage to prevent crashes.
 """
 
+import io
 import os
 import json
 import subprocess
-import tempfile
 import math
+import string
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from _renderer_kernels import build_gradient, interp_indices, wrap_breaks
+
+# Optional in-process audio probes (avoid launching ffprobe)
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+
 class LightweightVideoRenderer:
     """Lightweight video renderer optimized for memory efficiency."""
     
-    def __init__(self, width: int = 1280, height: int = 720, fps: int = 24):
+    def __init__(self, width: int = 1280, height: int = 720, fps: int = 24,
+                 pipe_format: str = 'raw'):
         # Reduced resolution and FPS for memory efficiency
         self.width = width
         self.height = height
         self.fps = fps
         
+        # How frames are streamed to ffmpeg: 'raw' rgb24 pixels, or 'jpeg'
+        # (much less pipe traffic, at the cost of a decode inside ffmpeg)
+        if pipe_format not in ('raw', 'jpeg'):
+            raise ValueError(f"Unsupported pipe_format: {pipe_format}")
+        self.pipe_format = pipe_format
+        
         # Simple emojis for engagement
         self.emojis = ['💻', '⚡', '🚀', '✨', '🎯', '💡', '✅', '🎉']
         
+        # Progress thresholds at which the video moves to the next key frame
+        self.key_frame_bounds = [0.25, 0.5, 0.75]
+        
+        # Fonts are parsed once and shared by every frame builder
+        self.font_title = self._safe_font("/System/Library/Fonts/Arial.ttf", 48)
+        self.font_code = self._safe_font("/System/Library/Fonts/Menlo.ttc", 24)
+        self.font_explanation = self._safe_font("/System/Library/Fonts/Arial.ttf", 36)
+        self.font_small = self._safe_font("/System/Library/Fonts/Arial.ttf", 28)
+        
+        # Column offsets for the code frame, measured from the real font
+        self._code_number_width = int(self.font_code.getlength("00 "))
+        self._code_emoji_width = int(max(self.font_code.getlength(e) for e in self.emojis)
+                                     + self.font_code.getlength(" "))
+        
+        # H.264 encoder chosen on first use (hardware when available)
+        self._video_encoder: Optional[str] = None
+        
+        # Per-character advance widths, keyed by font instance
+        self._char_widths: Dict[int, Dict[str, float]] = {}
+        
+        # Static backgrounds, rasterized once; frame builders start from a cheap .copy()
+        code_bg = self._gradient_array(15)
+        self._fill_panel(code_bg, 50, 100, self.width - 50, self.height - 100)
+        self._bg_title = Image.fromarray(self._gradient_array(20), 'RGB')
+        self._bg_code = Image.fromarray(code_bg, 'RGB')
+        self._bg_expl = Image.fromarray(self._gradient_array(10), 'RGB')
+        self._bg_summary = self._bg_expl
+        
+    def _safe_font(self, path: str, size: int) -> ImageFont.ImageFont:
+        """Load a TrueType font, falling back to PIL's default font."""
+        try:
+            return ImageFont.truetype(path, size)
+        except:
+            return ImageFont.load_default()
+    
     def create_animated_video(self, code: str, audio_path: str, explanation: Dict[str, Any],
                             output_path: str = "lightweight_video.mp4", narration_text: str = None) -> str:
         """Create a lightweight animated video."""
@@ -32,34 +91,30 @@ class LightweightVideoRenderer:
         # Get audio duration
         duration = self._get_audio_duration(audio_path)
         
-        # Use very few frames for memory efficiency
-        total_frames = min(60, int(duration * self.fps))  # Max 60 frames
-        frame_duration = duration / total_frames
-        
-        # Create minimal frames
-        frames = self._create_minimal_frames(code, explanation, total_frames, duration)
-        
-        # Save frames with compression
-        frame_dir = tempfile.mkdtemp()
-        frame_paths = []
-        
-        for i, frame in enumerate(frames):
-            frame_path = os.path.join(frame_dir, f"frame_{i:03d}.jpg")  # Use JPG for smaller size
-            frame.save(frame_path, 'JPEG', quality=70, optimize=True)  # Compress heavily
-            frame_paths.append(frame_path)
-        
-        # Create video with ffmpeg
-        self._create_video_from_frames(frame_paths, audio_path, output_path, duration, frame_duration)
+        # Only 4 distinct key frames exist
+        key_frames = self._create_key_frames(code, explanation)
         
-        # Cleanup immediately
-        for frame_path in frame_paths:
-            os.remove(frame_path)
-        os.rmdir(frame_dir)
+        # Stream the key frames straight into ffmpeg, each for its segment
+        self._create_video_from_frames(key_frames, audio_path, output_path, duration)
         
         return output_path
     
     def _get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration using ffprobe."""
+        """Get audio duration from the container header, falling back to ffprobe."""
+        if AV_AVAILABLE:
+            try:
+                with av.open(audio_path) as container:
+                    if container.duration is not None:
+                        return float(container.duration) / av.time_base
+            except Exception:
+                pass
+        
+        if SOUNDFILE_AVAILABLE:
+            try:
+                return float(sf.info(audio_path).duration)
+            except Exception:
+                pass
+        
         try:
             result = subprocess.run([
                 'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
@@ -69,58 +124,43 @@ class LightweightVideoRenderer:
         except:
             return 10.0  # Default duration
     
-    def _create_minimal_frames(self, code: str, explanation: Dict[str, Any], 
-                             total_frames: int, duration: float) -> List[Image.Image]:
-        """Create minimal frames with basic animations."""
-        frames = []
-        
-        # Create only 4 key frames
-        key_frames = self._create_key_frames(code, explanation)
-        
-        for i in range(total_frames):
-            progress = i / (total_frames - 1)
-            frame = self._interpolate_frame(key_frames, progress)
-            frames.append(frame)
-        
-        return frames
+    def _key_frame_indices(self, total_frames: int) -> np.ndarray:
+        """Map every output frame to the key frame it shows, in one vectorized pass."""
+        return interp_indices(total_frames, np.array(self.key_frame_bounds))
     
     def _create_key_frames(self, code: str, explanation: Dict[str, Any]) -> List[Image.Image]:
         """Create 4 simple key frames."""
-        key_frames = []
-        
-        # Frame 1: Title
-        frame1 = self._create_title_frame(explanation.get('title', 'Code Explanation'))
-        key_frames.append(frame1)
-        
-        # Frame 2: Code
-        frame2 = self._create_code_frame(code)
-        key_frames.append(frame2)
-        
-        # Frame 3: Explanation
-        frame3 = self._create_explanation_frame(explanation.get('overview', 'Code explanation'))
-        key_frames.append(frame3)
-        
-        # Frame 4: Summary
-        frame4 = self._create_summary_frame(explanation)
-        key_frames.append(frame4)
-        
-        return key_frames
+        jobs = [
+            # Frame 1: Title
+            (self._create_title_frame, explanation.get('title', 'Code Explanation')),
+            # Frame 2: Code
+            (self._create_code_frame, code),
+            # Frame 3: Explanation
+            (self._create_explanation_frame, explanation.get('overview', 'Code explanation')),
+            # Frame 4: Summary
+            (self._create_summary_frame, explanation),
+        ]
+
+        return [fn(arg) for fn, arg in jobs]
+    
+    def _gradient_array(self, spread: int) -> np.ndarray:
+        """Build a dark vertical gradient (30 -> 30 + spread)."""
+        return build_gradient(self.height, self.width, 30, spread)
+    
+    def _fill_panel(self, bg: np.ndarray, x0: int, y0: int, x1: int, y1: int,
+                    fill=(45, 45, 48), outline=(80, 80, 80), width: int = 2):
+        """Paint a filled, outlined rectangle (inclusive coords, like ImageDraw)."""
+        bg[y0:y1 + 1, x0:x1 + 1] = outline
+        bg[y0 + width:y1 + 1 - width, x0 + width:x1 + 1 - width] = fill
     
     def _create_title_frame(self, title: str) -> Image.Image:
         """Create simple title frame."""
-        img = Image.new('RGB', (self.width, self.height), color=(30, 30, 30))
-        draw = ImageDraw.Draw(img)
-        
         # Simple gradient
-        for y in range(0, self.height, 2):  # Skip every other line for speed
-            color = int(30 + (y / self.height) * 20)
-            draw.line([(0, y), (self.width, y)], fill=(color, color, color))
+        img = self._bg_title.copy()
+        draw = ImageDraw.Draw(img)
         
         # Title with emoji
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-        except:
-            font = ImageFont.load_default()
+        font = self.font_title
         
         emoji = self.emojis[0]
         full_title = f"{emoji} {title} {emoji}"
@@ -132,81 +172,49 @@ class LightweightVideoRenderer:
         x = (self.width - text_width) // 2
         y = (self.height - text_height) // 2
         
-        # Simple glow
-        draw.text((x + 2, y + 2), full_title, fill=(100, 100, 255), font=font)
-        draw.text((x, y), full_title, fill=(255, 255, 255), font=font)
+        # Simple glow, rendered as a stroke in the same glyph pass
+        draw.text((x, y), full_title, fill=(255, 255, 255), font=font,
+                  stroke_width=2, stroke_fill=(100, 100, 255))
         
         return img
     
     def _create_code_frame(self, code: str) -> Image.Image:
         """Create simple code frame."""
-        img = Image.new('RGB', (self.width, self.height), color=(30, 30, 30))
+        # Simple gradient with the code area already painted
+        img = self._bg_code.copy()
         draw = ImageDraw.Draw(img)
         
-        # Simple background
-        for y in range(0, self.height, 3):  # Skip lines for speed
-            color = int(30 + (y / self.height) * 15)
-            draw.line([(0, y), (self.width, y)], fill=(color, color, color))
-        
-        # Code area
-        draw.rectangle([50, 100, self.width - 50, self.height - 100], 
-                      fill=(45, 45, 48), outline=(80, 80, 80), width=2)
-        
         # Code text
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", 24)
-        except:
-            font = ImageFont.load_default()
-        
-        lines = code.strip().split('\n')
-        y_pos = 150
-        
-        for i, line in enumerate(lines[:10]):  # Limit lines
-            # Line number with emoji
-            line_num = f"{i+1:2d} "
-            emoji = self.emojis[i % len(self.emojis)]
-            
-            draw.text((70, y_pos), line_num, fill=(100, 100, 100), font=font)
-            draw.text((70 + len(line_num) * 12, y_pos), emoji, fill=(255, 200, 100), font=font)
-            draw.text((70 + len(line_num) * 12 + 20, y_pos), line, fill=(255, 255, 255), font=font)
-            
-            y_pos += 35
+        font = self.font_code
+        lines = code.strip().split('\n')[:10]  # Limit lines
+        
+        # One multiline call per column (line numbers, emojis, code) so each
+        # keeps its own color; spacing keeps the 35px line pitch
+        spacing = 35 - font.getbbox("A")[3]
+        numbers = "\n".join(f"{i+1:2d} " for i in range(len(lines)))
+        emojis = "\n".join(self.emojis[i % len(self.emojis)] for i in range(len(lines)))
+        code_text = "\n".join(lines)
+        
+        x = 70
+        draw.multiline_text((x, 150), numbers, fill=(100, 100, 100), font=font, spacing=spacing)
+        x += self._code_number_width
+        draw.multiline_text((x, 150), emojis, fill=(255, 200, 100), font=font, spacing=spacing)
+        x += self._code_emoji_width
+        draw.multiline_text((x, 150), code_text, fill=(255, 255, 255), font=font, spacing=spacing)
         
         return img
     
     def _create_explanation_frame(self, explanation: str) -> Image.Image:
         """Create simple explanation frame."""
-        img = Image.new('RGB', (self.width, self.height), color=(30, 30, 30))
+        # Simple gradient
+        img = self._bg_expl.copy()
         draw = ImageDraw.Draw(img)
         
-        # Simple background
-        for y in range(0, self.height, 3):
-            color = int(30 + (y / self.height) * 10)
-            draw.line([(0, y), (self.width, y)], fill=(color, color, color))
-        
         # Explanation text
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 36)
-        except:
-            font = ImageFont.load_default()
-        
-        # Simple text wrapping
-        words = explanation.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] < self.width - 200:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-        
-        if current_line:
-            lines.append(current_line)
+        font = self.font_explanation
+        
+        # Simple text wrapping from cached glyph widths
+        lines = self._wrap_text(explanation, font, self.width - 200)
         
         # Draw lines with emojis
         y_pos = (self.height - len(lines) * 50) // 2
@@ -222,23 +230,37 @@ class LightweightVideoRenderer:
         
         return img
     
+    def _char_width_table(self, font: ImageFont.ImageFont) -> Dict[str, float]:
+        """Measure every printable character of a font once."""
+        table = self._char_widths.get(id(font))
+        if table is None:
+            table = {ch: font.getlength(ch) for ch in string.printable}
+            self._char_widths[id(font)] = table
+        return table
+    
+    def _wrap_text(self, text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+        """Greedy word wrap using summed per-character widths."""
+        words = text.split()
+        if not words:
+            return []
+        
+        table = self._char_width_table(font)
+        for ch in set(text) - table.keys():
+            table[ch] = font.getlength(ch)
+        
+        word_widths = np.array([sum(table[ch] for ch in word) for word in words], dtype=np.float64)
+        starts = [0] + wrap_breaks(word_widths, table[' '], float(max_width)).tolist() + [len(words)]
+        return [" ".join(words[a:b]) for a, b in zip(starts, starts[1:])]
+    
     def _create_summary_frame(self, explanation: Dict[str, Any]) -> Image.Image:
         """Create simple summary frame."""
-        img = Image.new('RGB', (self.width, self.height), color=(30, 30, 30))
+        # Simple gradient
+        img = self._bg_summary.copy()
         draw = ImageDraw.Draw(img)
         
-        # Simple background
-        for y in range(0, self.height, 3):
-            color = int(30 + (y / self.height) * 10)
-            draw.line([(0, y), (self.width, y)], fill=(color, color, color))
-        
         # Summary text
-        try:
-            font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-            font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 28)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
+        font_large = self.font_title
+        font_small = self.font_small
         
         # Title
         title = "Success!"
@@ -266,49 +288,111 @@ class LightweightVideoRenderer:
         
         return img
     
-    def _interpolate_frame(self, key_frames: List[Image.Image], progress: float) -> Image.Image:
-        """Simple frame interpolation."""
-        if progress <= 0.25:
-            return key_frames[0]
-        elif progress <= 0.5:
-            return key_frames[1]
-        elif progress <= 0.75:
-            return key_frames[2]
-        else:
-            return key_frames[3]
+    def _detect_video_encoder(self) -> str:
+        """Pick the fastest working H.264 encoder (probed once per renderer)."""
+        if self._video_encoder is None:
+            self._video_encoder = 'libx264'
+            try:
+                listing = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                         capture_output=True, text=True).stdout
+            except FileNotFoundError:
+                listing = ''
+            
+            for encoder in ('h264_videotoolbox', 'h264_nvenc', 'h264_qsv'):
+                if encoder not in listing:
+                    continue
+                # Being compiled in does not mean the hardware is present,
+                # so confirm with a tiny test encode
+                probe = subprocess.run([
+                    'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                    '-f', 'lavfi', '-i', 'color=size=64x64:duration=0.1',
+                    '-c:v', encoder, '-f', 'null', '-'
+                ], capture_output=True)
+                if probe.returncode == 0:
+                    self._video_encoder = encoder
+                    break
+        return self._video_encoder
     
-    def _create_video_from_frames(self, frame_paths: List[str], audio_path: str, 
-                                output_path: str, duration: float, frame_duration: float):
-        """Create video from frames using ffmpeg with compression."""
-        
-        # Create frame list file
-        frame_list = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
-        for frame_path in frame_paths:
-            frame_list.write(f"file '{frame_path}'\n")
-            frame_list.write(f"duration {frame_duration}\n")
-        frame_list.close()
-        
-        # Use ffmpeg with high compression
-        cmd = [
-            'ffmpeg', '-y',  # Overwrite output
-            '-f', 'concat',  # Use concat demuxer
-            '-safe', '0',
-            '-i', frame_list.name,  # Input frame list
-            '-i', audio_path,  # Audio input
+    def _video_codec_args(self) -> List[str]:
+        """Encoder-specific ffmpeg arguments for the selected H.264 encoder."""
+        encoder = self._detect_video_encoder()
+        gop = ['-g', str(self.fps), '-bf', '0']  # Fixed one-second GOP, no B-frames
+        
+        if encoder == 'h264_videotoolbox':
+            return ['-c:v', encoder, '-b:v', '2M', '-allow_sw', '1', *gop]
+        if encoder == 'h264_nvenc':
+            return ['-c:v', encoder, '-preset', 'p1', '-rc', 'constqp', '-qp', '28', *gop]
+        if encoder == 'h264_qsv':
+            return ['-c:v', encoder, '-preset', 'veryfast', '-global_quality', '28', *gop]
+        
+        return [
             '-c:v', 'libx264',  # Video codec
             '-preset', 'ultrafast',  # Fast encoding
             '-crf', '28',  # High compression
+            *gop,
+            '-refs', '1',  # Single reference frame
+            '-tune', 'stillimage',  # Slideshow-like content
+            '-x264-params', 'scenecut=0:rc-lookahead=0',  # No scene-cut or lookahead analysis
+        ]
+    
+    def _audio_codec_args(self, audio_path: str) -> List[str]:
+        """Copy AAC audio as-is; re-encode anything else."""
+        if audio_path.lower().endswith(('.aac', '.m4a')):
+            return ['-c:a', 'copy']
+        return [
             '-c:a', 'aac',  # Audio codec
             '-b:a', '128k',  # Low audio bitrate
+        ]
+    
+    def _create_video_from_frames(self, key_frames: List[Image.Image], audio_path: str, 
+                                output_path: str, duration: float):
+        """Create video by piping key frames to ffmpeg with compression."""
+        
+        total_frames = max(1, round(duration * self.fps))
+        
+        if self.pipe_format == 'jpeg':
+            # Encode each key frame to JPEG in memory once
+            input_args = ['-f', 'image2pipe', '-c:v', 'mjpeg']
+            key_bytes = []
+            for frame in key_frames:
+                buf = io.BytesIO()
+                frame.save(buf, 'JPEG', quality=70)
+                key_bytes.append(buf.getvalue())
+        else:
+            # Convert each key frame to raw rgb24 bytes once
+            input_args = [
+                '-f', 'rawvideo',
+                '-pixel_format', 'rgb24',
+                '-video_size', f'{self.width}x{self.height}',
+            ]
+            key_bytes = [frame.tobytes() for frame in key_frames]
+        
+        # Use ffmpeg with high compression, reading frames from stdin
+        cmd = [
+            'ffmpeg', '-y',  # Overwrite output
+            *input_args,
+            '-framerate', str(self.fps),
+            '-i', 'pipe:0',  # Video input
+            '-i', audio_path,  # Audio input
+            *self._video_codec_args(),
+            *self._audio_codec_args(audio_path),
             '-pix_fmt', 'yuv420p',  # Pixel format
-            '-shortest',  # End when shortest input ends
+            '-frames:v', str(total_frames),  # Exact length, no -shortest sync
             output_path
         ]
         
-        subprocess.run(cmd, check=True)
         
-        # Cleanup
-        os.unlink(frame_list.name)
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, bufsize=1 << 20)
+        try:
+            for i in self._key_frame_indices(total_frames):
+                proc.stdin.write(key_bytes[i])
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code is checked below
+        finally:
+            proc.stdin.close()
+        
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
 
 
 def main():
@@ -9,12 +9,16 @@ import os
 import json
 import math
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Iterator
 from pathlib import Path
 import tempfile
 import re
 import subprocess
 import random
+import wave
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 try:
     from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
@@ -22,10 +26,21 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+from _renderer_kernels import blend_row_colors
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
 
 class PremiumAnimatedVideoRenderer:
     """Creates premium animated videos with stunning visual effects."""
     
+    # Leading keywords that select a line explanation, in one anchored match
+    _LINE_RE = re.compile(r'^(def |if |else|return |print\(|#)')
+    
     def __init__(self, width: int = 1920, height: int = 1080, fps: int = 30):
         """
         Initialize the premium animated video renderer.
@@ -49,23 +64,67 @@ class PremiumAnimatedVideoRenderer:
         self.highlight_color = (0, 255, 255)  # Cyan for highlighting
         self.accent_color = (255, 105, 180)  # Hot pink accents
         self.explanation_color = (173, 216, 230)  # Light blue explanations
+        self._bg_cache = {}
+        self._analyze_cache = {}
+        self._video_encoder = None  # Detected lazily so worker processes never probe ffmpeg
+        self._ass_filter = None
+        
+        # Load fonts once instead of on every frame
+        try:
+            self.font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 56)
+            self.font_code = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", 36)
+            self.font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 28)
+            self.font_explanation = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
+        except:
+            self.font_large = ImageFont.load_default()
+            self.font_code = ImageFont.load_default()
+            self.font_small = ImageFont.load_default()
+            self.font_explanation = ImageFont.load_default()
+        
+        # Per-character advance of the (monospace) code font, measured on a digit so the
+        # line-number column doesn't collide with code under a proportional fallback font
+        self._code_char_width = self.font_code.getlength('0')
+        # Text bboxes that repeat every frame
+        self._title_bbox_cache = {}
+        self._glow_masks = {}
+        
+        # Code listing layout; per-line render info is filled in by _prepare_code_lines
+        self._code_start_y = 280
+        self._code_line_height = 45
+        self._prepared_code_lines = None
+        self._line_render_info = []
         
         # Animation settings
         self.particle_count = 50
-        self.particles = []
         self._init_particles()
         
+        # Gradient never changes, so build it once and paste it into a reused frame buffer
+        self._bg_template = self._create_gradient_background(self.width, self.height)
+        self._frame_img = self._bg_template.copy()
+        self._frame_draw = ImageDraw.Draw(self._frame_img, 'RGBA')
+        
+        # Highlight fade rows (same ratio math as the background), broadcast to line width on demand
+        highlight_rows = 43
+        ratio = np.arange(highlight_rows, dtype=np.float32)[:, None] / highlight_rows
+        self._highlight_gradient = (np.array(self.highlight_color, dtype=np.float32) * 0.2 * (1 - ratio)).astype(np.uint8)
+        
     def _init_particles(self):
         """Initialize floating particles for background effect."""
-        for _ in range(self.particle_count):
-            self.particles.append({
-                'x': random.randint(0, self.width),
-                'y': random.randint(0, self.height),
-                'vx': random.uniform(-0.5, 0.5),
-                'vy': random.uniform(-0.5, 0.5),
-                'size': random.uniform(1, 3),
-                'alpha': random.uniform(0.1, 0.3)
-            })
+        # Struct-of-arrays layout so the per-frame update runs as NumPy vector ops
+        particles = [(random.randint(0, self.width), random.randint(0, self.height),
+                      random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5),
+                      random.uniform(1, 3), random.uniform(0.1, 0.3))
+                     for _ in range(self.particle_count)]
+        columns = np.array(particles, dtype=np.float32).reshape(-1, 6).T.copy()
+        self._px0, self._py0, self._pvx, self._pvy, self._psize, self._palpha = columns
+    
+    def _particle_state(self) -> Tuple[np.ndarray, ...]:
+        """Particle arrays, so worker processes can draw the same particles."""
+        return (self._px0, self._py0, self._pvx, self._pvy, self._psize, self._palpha)
+    
+    def _set_particle_state(self, state: Tuple[np.ndarray, ...]):
+        """Adopt particle arrays from another renderer."""
+        self._px0, self._py0, self._pvx, self._pvy, self._psize, self._palpha = state
     
     def create_animated_video(self, code: str, audio_path: str, explanation: Dict[str, Any],
                             output_path: str = "premium_code.mp4", narration_text: str = None) -> str:
@@ -85,8 +144,11 @@ class PremiumAnimatedVideoRenderer:
             # Get audio duration
             duration = self._get_audio_duration(audio_path)
             
+            # Split the code once for explanations and frame rendering
+            code_lines = code.strip().split('\n')
+            
             # Generate line-by-line explanations
-            line_explanations = self._generate_line_explanations(code, explanation)
+            line_explanations = self._generate_line_explanations(code_lines, explanation)
             
             # Initialize subtitle overlay if narration text is provided
             subtitle_overlay = None
@@ -100,33 +162,40 @@ class PremiumAnimatedVideoRenderer:
                 except Exception as e:
                     print(f"⚠️ Subtitle overlay failed: {e}")
             
+            # Let libass burn the subtitle text in during encoding when ffmpeg has it,
+            # leaving only the short emoji animations to be drawn in Python
+            subtitles_path = None
+            if subtitle_segments and self._detect_ass_filter():
+                fd, subtitles_path = tempfile.mkstemp(suffix='.ass')
+                os.close(fd)
+                subtitle_overlay.write_ass(subtitle_segments, subtitles_path, self.width, self.height)
+            
             # Use more frames for smooth animations
             frame_interval = 1.0 / self.fps  # 30 FPS for smooth motion
             total_frames = int(duration * self.fps)
             
             print(f"🎬 Creating {total_frames} premium frames for {duration:.1f}s video...")
             
-            # Create frames directory
-            frames_dir = "temp_frames"
-            os.makedirs(frames_dir, exist_ok=True)
-            
-            # Generate premium frames with subtitle overlay
-            self._generate_premium_frames(code, explanation, line_explanations, frames_dir, total_frames, frame_interval, subtitle_overlay, subtitle_segments)
-            
-            # Create video from frames using ffmpeg
-            self._create_video_from_frames(frames_dir, audio_path, output_path, duration, frame_interval)
-            
-            # Clean up frames
-            self._cleanup_frames(frames_dir)
+            try:
+                # Generate premium frames with subtitle overlay (lazily, as raw RGB bytes)
+                frames = self._generate_premium_frames(code_lines, explanation, line_explanations, total_frames, frame_interval,
+                                                       subtitle_overlay, subtitle_segments,
+                                                       subtitle_text=subtitles_path is None)
+                
+                # Stream frames straight into ffmpeg
+                self._create_video_from_frames(frames, audio_path, output_path, duration, frame_interval,
+                                               subtitles_path=subtitles_path)
+            finally:
+                if subtitles_path and os.path.exists(subtitles_path):
+                    os.remove(subtitles_path)
             
             return output_path
             
         except Exception as e:
             raise Exception(f"Premium video rendering failed: {str(e)}")
     
-    def _generate_line_explanations(self, code: str, explanation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _generate_line_explanations(self, code_lines: List[str], explanation: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate detailed explanations for each line of code."""
-        code_lines = code.strip().split('\n')
         line_explanations = []
         
         for i, line in enumerate(code_lines):
@@ -137,61 +206,101 @@ class PremiumAnimatedVideoRenderer:
             # Generate explanation based on line content
             explanation_text = self._analyze_line(line, i, code_lines)
             
+            # Wrap and center once here rather than on every frame the explanation is shown
+            wrapped_lines = self._wrap_text(explanation_text, self.font_explanation, self.width - 200)
+            wrapped_x = []
+            for wrapped in wrapped_lines[:3]:
+                bbox = self.font_explanation.getbbox(wrapped)
+                wrapped_x.append((self.width - (bbox[2] - bbox[0])) // 2)
+            
             line_explanations.append({
                 'line_number': i + 1,
                 'code': line,
                 'explanation': explanation_text,
+                'wrapped_lines': wrapped_lines,
+                'wrapped_x': wrapped_x,
                 'start_time': i * 2.0,  # Each line gets 2 seconds
                 'duration': 1.5  # Explanation duration
             })
         
         return line_explanations
     
+    def _wrap_text(self, text: str, font, max_width: int) -> List[str]:
+        """Greedy word wrap so each line stays narrower than max_width."""
+        lines = []
+        current_line = ""
+        
+        for word in text.split():
+            test_line = current_line + " " + word if current_line else word
+            bbox = font.getbbox(test_line)
+            if bbox[2] - bbox[0] < max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line)
+                current_line = word
+        if current_line:
+            lines.append(current_line)
+        
+        return lines
+    
     def _analyze_line(self, line: str, line_index: int, all_lines: List[str]) -> str:
         """Analyze a single line of code and generate explanation."""
         line = line.strip()
         
+        # Explanations depend only on the line text, so repeated lines are free
+        cached = self._analyze_cache.get(line)
+        if cached is None:
+            cached = self._explain_line(line)
+            self._analyze_cache[line] = cached
+        return cached
+    
+    def _explain_line(self, line: str) -> str:
+        """Build the explanation for a stripped line, dispatching on its leading keyword."""
+        match = self._LINE_RE.match(line)
+        prefix = match.group(1) if match else None
+        
         # Function definition
-        if line.startswith('def '):
+        if prefix == 'def ':
             func_name = line.split('(')[0].replace('def ', '')
             return f"This defines a function called '{func_name}' that can be called later in the code."
         
         # If statement
-        elif line.startswith('if '):
+        elif prefix == 'if ':
             condition = line.replace('if ', '').replace(':', '').strip()
             return f"This checks if {condition} is true. If it is, the code inside the if block will run."
         
         # Else statement
-        elif line.startswith('else'):
+        elif prefix == 'else':
             return "This runs when the previous if condition is false. It's the alternative path."
         
         # Return statement
-        elif line.startswith('return '):
+        elif prefix == 'return ':
             value = line.replace('return ', '').strip()
             return f"This returns the value {value} from the function, ending its execution."
         
         # Print statement
-        elif line.startswith('print('):
+        elif prefix == 'print(':
             content = line.replace('print(', '').replace(')', '').strip()
             return f"This prints {content} to the console so we can see the output."
         
+        # Comment
+        elif prefix == '#':
+            comment = line.replace('#', '').strip()
+            return f"This is a comment: {comment}. Comments help explain the code but don't affect execution."
+        
         # Variable assignment
-        elif '=' in line and not line.startswith('#'):
+        elif '=' in line:
             parts = line.split('=')
             var_name = parts[0].strip()
             value = parts[1].strip()
             return f"This assigns the value {value} to the variable '{var_name}'."
         
         # Function call
-        elif '(' in line and ')' in line and not line.startswith('#'):
+        elif '(' in line and ')' in line:
             func_name = line.split('(')[0].strip()
             return f"This calls the function '{func_name}' to execute its code."
         
-        # Comment
-        elif line.startswith('#'):
-            comment = line.replace('#', '').strip()
-            return f"This is a comment: {comment}. Comments help explain the code but don't affect execution."
-        
         # Indented code (likely inside a block)
         elif line.startswith('    ') or line.startswith('\t'):
             return "This line is indented, meaning it's part of a code block (like inside an if statement or function)."
@@ -200,111 +309,257 @@ class PremiumAnimatedVideoRenderer:
         else:
             return f"This line contains: {line}. It's part of the program's logic."
     
-    def _generate_premium_frames(self, code: str, explanation: Dict[str, Any], line_explanations: List[Dict[str, Any]], 
-                               frames_dir: str, total_frames: int, frame_interval: float,
-                               subtitle_overlay=None, subtitle_segments=None):
-        """Generate premium frames with advanced animations."""
-        code_lines = code.strip().split('\n')
+    def _generate_premium_frames(self, code_lines: List[str], explanation: Dict[str, Any], line_explanations: List[Dict[str, Any]], 
+                               total_frames: int, frame_interval: float,
+                               subtitle_overlay=None, subtitle_segments=None,
+                               subtitle_text: bool = True) -> Iterator[bytes]:
+        """Generate premium frames with advanced animations, yielding raw RGB bytes in order."""
+        job = {
+            'size': (self.width, self.height, self.fps),
+            'particles': self._particle_state(),
+            'code_lines': code_lines,
+            'explanation': explanation,
+            'line_explanations': line_explanations,
+            'frame_interval': frame_interval,
+            'subtitle_overlay': subtitle_overlay,
+            'subtitle_segments': subtitle_segments,
+            'subtitle_text': subtitle_text,
+        }
+        
+        # Only the first frame of each run of identical content keys gets rendered
+        runs = self._frame_runs(total_frames, frame_interval, line_explanations)
+        next_run = 0
+        
+        # Frames are independent given their time, so spread them across cores
+        workers = min(os.cpu_count() or 1, max(1, len(runs) // 16))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_premium_worker_init,
+                                         initargs=(job,)) as executor:
+                    # Keep a bounded window in flight so finished frames don't pile up ahead of ffmpeg
+                    pending = deque()
+                    submitted = 0
+                    while next_run < len(runs):
+                        while submitted < len(runs) and len(pending) < workers * 4:
+                            pending.append(executor.submit(_premium_render_one, runs[submitted][0]))
+                            submitted += 1
+                        frame_bytes = pending.popleft().result()
+                        
+                        frame_num, repeat = runs[next_run]
+                        next_run += 1
+                        for i in range(frame_num, frame_num + repeat):
+                            # Progress indicator
+                            if i % 30 == 0:
+                                print(f"   Generated frame {i}/{total_frames}")
+                            yield frame_bytes
+                return
+            except (OSError, BrokenProcessPool) as e:
+                print(f"⚠️ Parallel frame generation failed ({e}), rendering serially")
+        
+        for frame_num, repeat in runs[next_run:]:
+            frame_bytes = self._render_frame_bytes(job, frame_num)
+            for i in range(frame_num, frame_num + repeat):
+                # Progress indicator
+                if i % 30 == 0:
+                    print(f"   Generated frame {i}/{total_frames}")
+                yield frame_bytes
+    
+    def _frame_runs(self, total_frames: int, frame_interval: float,
+                    line_explanations: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """
+        Group consecutive frames with the same content key into (first_frame, repeat) runs.
         
+        The key is the explained line plus time rounded to 0.1s, so animation advances
+        at 10 steps per second while the output keeps its full frame rate.
+        """
+        runs = []
+        last_key = None
         for frame_num in range(total_frames):
-            # Calculate animation parameters
             time = frame_num * frame_interval
+            explained = None
+            for idx, exp in enumerate(line_explanations):
+                if exp['start_time'] <= time <= exp['start_time'] + exp['duration']:
+                    explained = idx
+                    break
+            key = (explained, round(time, 1))
             
-            # Create frame
-            img = self._create_premium_frame(code_lines, explanation, line_explanations, time, frame_num, subtitle_overlay, subtitle_segments)
-            
-            # Save frame with high quality
-            frame_path = os.path.join(frames_dir, f"frame_{frame_num:06d}.png")
-            img.save(frame_path, optimize=True, quality=95)
-            
-            # Progress indicator
-            if frame_num % 30 == 0:
-                print(f"   Generated frame {frame_num}/{total_frames}")
+            if key == last_key:
+                runs[-1][1] += 1
+            else:
+                runs.append([frame_num, 1])
+                last_key = key
+        return [tuple(run) for run in runs]
     
-    def _create_gradient_background(self, width: int, height: int) -> Image.Image:
-        """Create a beautiful gradient background."""
-        img = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(img)
+    def _render_frame_bytes(self, job: Dict[str, Any], frame_num: int) -> bytes:
+        """Render one frame of a generation job as raw rgb24 bytes."""
+        # Calculate animation parameters
+        time = frame_num * job['frame_interval']
         
-        # Create gradient from top to bottom
-        for y in range(height):
-            ratio = y / height
-            r = int(self.background_gradient[0][0] * (1 - ratio) + self.background_gradient[1][0] * ratio)
-            g = int(self.background_gradient[0][1] * (1 - ratio) + self.background_gradient[1][1] * ratio)
-            b = int(self.background_gradient[0][2] * (1 - ratio) + self.background_gradient[1][2] * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
+        # Create frame
+        img = self._create_premium_frame(job['code_lines'], job['explanation'], job['line_explanations'],
+                                         time, frame_num, job['subtitle_overlay'], job['subtitle_segments'],
+                                         job['subtitle_text'])
         
-        return img
+        return img.tobytes()
+    
+    def _create_gradient_background(self, width: int, height: int) -> Image.Image:
+        """Create a beautiful gradient background."""
+        key = (width, height)
+        arr = self._bg_cache.get(key)
+        if arr is None:
+            arr = self._build_gradient_array(width, height)
+            self._bg_cache[key] = arr
+        
+        # fromarray copies RGB data, so callers are free to draw on the result
+        return Image.fromarray(arr, 'RGB')
+    
+    def _build_gradient_array(self, width: int, height: int) -> np.ndarray:
+        """Build the top-to-bottom gradient in one broadcast instead of a draw.line per row."""
+        ratio = np.linspace(0, 1, height, endpoint=False, dtype=np.float32)[:, None]
+        c0 = np.array(self.background_gradient[0], dtype=np.float32)
+        c1 = np.array(self.background_gradient[1], dtype=np.float32)
+        rgb = (c0 * (1 - ratio) + c1 * ratio).astype(np.uint8)
+        return np.broadcast_to(rgb[:, None, :], (height, width, 3)).copy()
+    
+    def _text_bbox(self, text: str, font) -> Tuple[int, int, int, int]:
+        """Text bounding box, measured once per (text, font)."""
+        key = (text, id(font))
+        bbox = self._title_bbox_cache.get(key)
+        if bbox is None:
+            bbox = font.getbbox(text)
+            self._title_bbox_cache[key] = bbox
+        return bbox
+    
+    def _glow_mask(self, text: str, font) -> Tuple[Image.Image, int]:
+        """Blurred glyph mask for a text glow, rasterized once per (text, font)."""
+        key = (text, id(font))
+        cached = self._glow_masks.get(key)
+        if cached is None:
+            radius = 3
+            pad = radius * 3
+            bbox = font.getbbox(text)
+            mask = Image.new('L', (bbox[2] + 2 * pad, bbox[3] + 2 * pad), 0)
+            ImageDraw.Draw(mask).text((pad, pad), text, fill=255, font=font)
+            cached = (mask.filter(ImageFilter.GaussianBlur(radius)), pad)
+            self._glow_masks[key] = cached
+        return cached
+    
+    def _paste_glow(self, img: Image.Image, xy: Tuple[float, float], text: str, font,
+                    color: Tuple[int, int, int], alpha: int):
+        """Blend a soft glow of text drawn at xy onto img."""
+        if alpha <= 0:
+            return
+        mask, pad = self._glow_mask(text, font)
+        if alpha < 255:
+            mask = mask.point(lambda p: p * alpha // 255)
+        x = int(round(xy[0])) - pad
+        y = int(round(xy[1])) - pad
+        img.paste(color, (x, y, x + mask.width, y + mask.height), mask)
+    
+    def _blend_highlight(self, img: Image.Image, rect: List[int], alpha: int):
+        """Blend the highlight fade into img over rect (inclusive x range) with a compiled kernel."""
+        x0 = max(0, rect[0])
+        y0 = max(0, rect[1])
+        x1 = min(self.width, rect[2] + 1)
+        y1 = min(self.height, rect[1] + self._highlight_gradient.shape[0])
+        if alpha <= 0 or x0 >= x1 or y0 >= y1:
+            return
+        
+        region = np.array(img.crop((x0, y0, x1, y1)))
+        blend_row_colors(region, self._highlight_gradient[y0 - rect[1]:y1 - rect[1]], alpha)
+        img.paste(Image.fromarray(region, 'RGB'), (x0, y0))
     
     def _draw_particles(self, draw: ImageDraw.Draw, time: float):
         """Draw floating particles in the background."""
-        for particle in self.particles:
-            # Update particle position
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            
-            # Wrap around edges
-            if particle['x'] < 0:
-                particle['x'] = self.width
-            elif particle['x'] > self.width:
-                particle['x'] = 0
-            if particle['y'] < 0:
-                particle['y'] = self.height
-            elif particle['y'] > self.height:
-                particle['y'] = 0
-            
-            # Draw particle with pulsing effect
-            pulse = 0.5 + 0.5 * math.sin(time * 2 + particle['x'] * 0.01)
-            size = particle['size'] * pulse
-            alpha = int(particle['alpha'] * 255 * pulse)
-            
-            color = (100, 150, 255, alpha)
-            x, y = int(particle['x']), int(particle['y'])
-            
-            # Draw particle as a small circle
-            draw.ellipse([x-size, y-size, x+size, y+size], fill=color)
+        # Positions are a pure function of the frame index, so frames can render in any order
+        steps = int(round(time * self.fps)) + 1
+        px = np.mod(self._px0 + self._pvx * steps, self.width)
+        py = np.mod(self._py0 + self._pvy * steps, self.height)
+        
+        # Pulsing effect for every particle at once
+        pulse = 0.5 + 0.5 * np.sin(time * 2 + px * 0.01)
+        sizes = (self._psize * pulse).tolist()
+        alphas = (self._palpha * 255 * pulse).astype(np.int32).tolist()
+        xs = px.astype(np.int32).tolist()
+        ys = py.astype(np.int32).tolist()
+        
+        # Only the ellipse calls remain in Python
+        for x, y, size, alpha in zip(xs, ys, sizes, alphas):
+            draw.ellipse([x-size, y-size, x+size, y+size], fill=(100, 150, 255, alpha))
+    
+    def _prepare_code_lines(self, code_lines: List[str]):
+        """Precompute the text, line-number label and positions of each visible code line."""
+        self._prepared_code_lines = code_lines
+        self._line_render_info = []
+        for i, line in enumerate(code_lines[:min(10, len(code_lines))]):
+            num_str = f"{i+1:2d} "
+            code_x = 80 + round(len(num_str) * self._code_char_width)
+            self._line_render_info.append({
+                'line_number': i + 1,
+                'text': line,
+                'num_str': num_str,
+                'y': self._code_start_y + i * self._code_line_height,
+                'code_x': code_x,
+                'code_right': code_x + round(len(line) * self._code_char_width),
+                'start_time': i * 2.0,
+                # Glyph coverage rasterized once; frames only tint it by the fade color
+                'num_sprite': self._text_sprite(num_str, self.font_code),
+                'code_sprite': self._text_sprite(line, self.font_code),
+            })
+    
+    def _text_sprite(self, text: str, font) -> Optional[Tuple[Image.Image, int, int]]:
+        """Rasterize text once into an L coverage mask, with its offset from the draw origin."""
+        bbox = font.getbbox(text)
+        if bbox[2] <= bbox[0] or bbox[3] <= bbox[1]:
+            return None
+        mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+        ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=font)
+        return mask, bbox[0], bbox[1]
+    
+    def _paste_sprite(self, img: Image.Image, sprite: Optional[Tuple[Image.Image, int, int]],
+                      xy: Tuple[int, int], color: Tuple[int, ...]):
+        """Paint a text sprite at the position draw.text would have used, in the given color."""
+        if sprite is None:
+            return
+        mask, dx, dy = sprite
+        x = xy[0] + dx
+        y = xy[1] + dy
+        img.paste(color, (x, y, x + mask.width, y + mask.height), mask)
     
     def _create_premium_frame(self, code_lines: List[str], explanation: Dict[str, Any], 
                             line_explanations: List[Dict[str, Any]], time: float, frame_num: int,
-                            subtitle_overlay=None, subtitle_segments=None) -> Image.Image:
-        """Create a premium frame with advanced visual effects."""
-        # Create gradient background
-        img = self._create_gradient_background(self.width, self.height)
-        draw = ImageDraw.Draw(img, 'RGBA')
+                            subtitle_overlay=None, subtitle_segments=None,
+                            subtitle_text: bool = True) -> Image.Image:
+        """
+        Create a premium frame with advanced visual effects.
+        
+        With subtitle_text=False only the emoji overlays are drawn, for when ffmpeg
+        burns the subtitle text in from an ASS script instead.
+        """
+        # Reset the reused frame buffer to the cached gradient background
+        img = self._frame_img
+        img.paste(self._bg_template, (0, 0))
+        draw = self._frame_draw
         
         # Draw particles
         self._draw_particles(draw, time)
         
-        # Load fonts
-        try:
-            font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 56)
-            font_code = ImageFont.truetype("/System/Library/Fonts/Menlo.ttc", 36)
-            font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 28)
-            font_explanation = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_code = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_explanation = ImageFont.load_default()
-        
         # Animated title with glow effect
         title_text = explanation.get('title', 'Premium Code Explanation')
         title_alpha = min(1.0, time / 1.5)  # Fade in over 1.5 seconds
         
-        title_bbox = draw.textbbox((0, 0), title_text, font=font_large)
+        title_bbox = self._text_bbox(title_text, self.font_large)
         title_width = title_bbox[2] - title_bbox[0]
         title_x = (self.width - title_width) // 2
         title_y = 80 + math.sin(time * 0.5) * 3  # Gentle floating
         
         # Draw title glow
-        glow_alpha = int(50 * title_alpha)
-        for offset in range(1, 4):
-            glow_color = (0, 255, 255, glow_alpha // offset)
-            draw.text((title_x + offset, title_y + offset), title_text, fill=glow_color, font=font_large)
+        glow_alpha = int(255 * title_alpha)
+        self._paste_glow(img, (title_x, title_y), title_text, self.font_large, (0, 255, 255), glow_alpha)
         
         # Draw main title
         title_color = tuple(int(c * title_alpha) for c in self.text_color)
-        draw.text((title_x, title_y), title_text, fill=title_color, font=font_large)
+        draw.text((title_x, title_y), title_text, fill=title_color, font=self.font_large)
         
         # Animated avatar with effects
         avatar_text = "👨‍💻"
@@ -314,18 +569,18 @@ class PremiumAnimatedVideoRenderer:
         avatar_y = 180 + avatar_bounce
         
         # Draw avatar glow
-        avatar_glow = int(30 * (0.5 + 0.5 * math.sin(time * 2)))
-        for offset in range(1, 3):
-            glow_color = (255, 105, 180, avatar_glow // offset)
-            draw.text((avatar_x + offset, avatar_y + offset), avatar_text, fill=glow_color, font=font_large)
+        avatar_glow = int(255 * (0.5 + 0.5 * math.sin(time * 2)))
+        self._paste_glow(img, (avatar_x, avatar_y), avatar_text, self.font_large, (255, 105, 180), avatar_glow)
         
         # Draw avatar
-        draw.text((avatar_x, avatar_y), avatar_text, fill='white', font=font_large)
+        draw.text((avatar_x, avatar_y), avatar_text, fill='white', font=self.font_large)
         
-        # Code area with premium styling
-        code_start_y = 280
-        line_height = 45
-        max_lines = min(10, len(code_lines))
+        # Code area with premium styling (per-line layout is precomputed once per code listing)
+        if code_lines is not self._prepared_code_lines:
+            self._prepare_code_lines(code_lines)
+        code_start_y = self._code_start_y
+        line_height = self._code_line_height
+        max_lines = len(self._line_render_info)
         
         # Find which line is currently being explained
         current_explanation = None
@@ -339,91 +594,57 @@ class PremiumAnimatedVideoRenderer:
         draw.rectangle(code_bg_rect, fill=(*self.code_bg_color, 200), outline=(100, 150, 255, 100), width=2)
         
         # Draw code lines with advanced effects
-        for i, line in enumerate(code_lines[:max_lines]):
+        for info in self._line_render_info:
             # Line animation with easing
-            line_start_time = i * 2.0
-            line_alpha = min(1.0, (time - line_start_time) / 0.8)
+            line_alpha = min(1.0, (time - info['start_time']) / 0.8)
             
             if line_alpha > 0:
+                line = info['text']
+                line_y = info['y']
+                code_x = info['code_x']
+                
                 # Check if this line is currently being explained
                 is_currently_explained = (current_explanation and 
-                                        current_explanation['line_number'] == i + 1)
+                                        current_explanation['line_number'] == info['line_number'])
                 
                 # Line number with glow
-                line_num = f"{i+1:2d} "
                 line_num_color = tuple(int(c * line_alpha) for c in (150, 150, 150))
-                draw.text((80, code_start_y + i * line_height), line_num, fill=line_num_color, font=font_code)
+                self._paste_sprite(img, info['num_sprite'], (80, line_y), line_num_color)
                 
                 # Code line with advanced highlighting
-                code_x = 80 + len(line_num) * 15
                 if is_currently_explained:
                     # Currently explained line - premium highlighting
                     pulse = 0.5 + 0.5 * math.sin((time - current_explanation['start_time']) * 8)
                     line_color = tuple(int(c * line_alpha * (1 + pulse * 0.3)) for c in self.highlight_color)
                     
                     # Draw highlight background with gradient
-                    highlight_rect = [
-                        code_x - 15, 
-                        code_start_y + i * line_height - 8,
-                        code_x + len(line) * 15 + 15,
-                        code_start_y + i * line_height + 35
-                    ]
+                    highlight_rect = [code_x - 15, line_y - 8, info['code_right'] + 15, line_y + 35]
                     
-                    # Gradient highlight background
-                    for y_offset in range(highlight_rect[1], highlight_rect[3]):
-                        ratio = (y_offset - highlight_rect[1]) / (highlight_rect[3] - highlight_rect[1])
-                        r = int(self.highlight_color[0] * 0.2 * (1 - ratio))
-                        g = int(self.highlight_color[1] * 0.2 * (1 - ratio))
-                        b = int(self.highlight_color[2] * 0.2 * (1 - ratio))
-                        alpha = int(100 * line_alpha * pulse)
-                        draw.line([(highlight_rect[0], y_offset), (highlight_rect[2], y_offset)], 
-                                fill=(r, g, b, alpha))
+                    # Gradient highlight background, blended in one compiled pass
+                    self._blend_highlight(img, highlight_rect, int(100 * line_alpha * pulse))
                     
                     # Draw line glow
-                    glow_alpha = int(50 * line_alpha * pulse)
-                    for offset in range(1, 3):
-                        glow_color = (*self.highlight_color, glow_alpha // offset)
-                        draw.text((code_x + offset, code_start_y + i * line_height + offset), 
-                                line, fill=glow_color, font=font_code)
+                    glow_alpha = int(255 * line_alpha * pulse)
+                    self._paste_glow(img, (code_x, line_y), line, self.font_code,
+                                     self.highlight_color, glow_alpha)
                 else:
                     # Normal line
                     line_color = tuple(int(c * line_alpha) for c in self.text_color)
                 
-                draw.text((code_x, code_start_y + i * line_height), line, fill=line_color, font=font_code)
+                self._paste_sprite(img, info['code_sprite'], (code_x, line_y), line_color)
         
         # Draw current line explanation with premium styling
         if current_explanation:
-            explanation_text = current_explanation['explanation']
             explanation_alpha = min(1.0, (time - current_explanation['start_time']) / 0.5)
             
-            # Wrap explanation text
-            words = explanation_text.split()
-            lines = []
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + " " + word if current_line else word
-                bbox = draw.textbbox((0, 0), test_line, font=font_explanation)
-                if bbox[2] - bbox[0] < self.width - 200:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = word
-            if current_line:
-                lines.append(current_line)
-            
             # Draw explanation background
             explanation_bg_rect = [100, self.height - 200, self.width - 100, self.height - 80]
             draw.rectangle(explanation_bg_rect, fill=(25, 30, 40, 180), outline=(100, 150, 255, 150), width=2)
             
             # Draw explanation lines with effects
             explanation_y = self.height - 180
-            for j, line in enumerate(lines[:3]):
-                bbox = draw.textbbox((0, 0), line, font=font_explanation)
-                line_width = bbox[2] - bbox[0]
-                line_x = (self.width - line_width) // 2
-                
+            for j, (line, line_x) in enumerate(zip(current_explanation['wrapped_lines'][:3],
+                                                   current_explanation['wrapped_x'])):
                 # Staggered fade-in with glow
                 line_alpha = min(1.0, (time - current_explanation['start_time'] - j * 0.2) / 0.6)
                 
@@ -432,11 +653,11 @@ class PremiumAnimatedVideoRenderer:
                 for offset in range(1, 2):
                     glow_color = (*self.explanation_color, glow_alpha // offset)
                     draw.text((line_x + offset, explanation_y + j * 30 + offset), 
-                            line, fill=glow_color, font=font_explanation)
+                            line, fill=glow_color, font=self.font_explanation)
                 
                 # Draw main text
                 line_color = tuple(int(c * line_alpha * explanation_alpha) for c in self.explanation_color)
-                draw.text((line_x, explanation_y + j * 30), line, fill=line_color, font=font_explanation)
+                draw.text((line_x, explanation_y + j * 30), line, fill=line_color, font=self.font_explanation)
         
         # Add animated border with glow
         border_alpha = min(1.0, time / 1.0)
@@ -454,27 +675,45 @@ class PremiumAnimatedVideoRenderer:
         draw.rectangle([40, 250, self.width - 40, code_start_y + max_lines * line_height + 40], 
                       outline=border_color, width=2)
         
-        # Add subtitle overlay if available
+        # Add subtitle overlay if available (tight layers pasted through their own alpha,
+        # so only the covered region of the reused RGB frame is touched)
         if subtitle_overlay and subtitle_segments:
             for segment in subtitle_segments:
-                # Create subtitle frame
-                subtitle_img = subtitle_overlay.create_subtitle_frame(
-                    segment, self.width, self.height, time
-                )
-                if subtitle_img:
-                    img = Image.alpha_composite(img.convert('RGBA'), subtitle_img)
+                # Create subtitle layer
+                if subtitle_text:
+                    subtitle_layer = subtitle_overlay.create_subtitle_layer(
+                        segment, self.width, self.height, time
+                    )
+                    if subtitle_layer:
+                        layer, position = subtitle_layer
+                        img.paste(layer, position, layer)
                 
-                # Create emoji overlay
-                emoji_img = subtitle_overlay.create_emoji_overlay(
+                # Create emoji layer
+                emoji_layer = subtitle_overlay.create_emoji_layer(
                     segment, self.width, self.height, time
                 )
-                if emoji_img:
-                    img = Image.alpha_composite(img.convert('RGBA'), emoji_img)
+                if emoji_layer:
+                    layer, position = emoji_layer
+                    img.paste(layer, position, layer)
         
         return img
     
     def _get_audio_duration(self, audio_path: str) -> float:
-        """Get audio duration using ffprobe."""
+        """Get audio duration from the file header, using ffprobe only as a last resort."""
+        if SOUNDFILE_AVAILABLE:
+            try:
+                return float(sf.info(audio_path).duration)
+            except Exception:
+                pass
+        
+        # WAV (the usual TTS output) can be read with the standard library
+        if audio_path.lower().endswith('.wav'):
+            try:
+                with wave.open(audio_path, 'rb') as wav:
+                    return wav.getnframes() / float(wav.getframerate())
+            except (wave.Error, EOFError, OSError):
+                pass
+        
         try:
             result = subprocess.run([
                 'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
@@ -488,23 +727,97 @@ class PremiumAnimatedVideoRenderer:
         except:
             return 10.0  # Default duration
     
-    def _create_video_from_frames(self, frames_dir: str, audio_path: str, output_path: str, duration: float, frame_interval: float):
-        """Create video from frames and audio using ffmpeg with high quality."""
+    def _detect_video_encoder(self) -> str:
+        """Pick the fastest working H.264 encoder (probed once per renderer, on first encode)."""
+        if self._video_encoder is None:
+            self._video_encoder = 'libx264'
+            try:
+                listing = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                         capture_output=True, text=True).stdout
+            except FileNotFoundError:
+                listing = ''
+            
+            for encoder in ('h264_nvenc', 'h264_videotoolbox', 'h264_qsv'):
+                if encoder not in listing:
+                    continue
+                # Being compiled in does not mean the hardware is present,
+                # so confirm with a tiny test encode
+                probe = subprocess.run([
+                    'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                    '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+                    '-c:v', encoder, '-f', 'null', '-'
+                ], capture_output=True)
+                if probe.returncode == 0:
+                    self._video_encoder = encoder
+                    break
+        return self._video_encoder
+    
+    def _detect_ass_filter(self) -> bool:
+        """Check once whether ffmpeg was built with libass (the 'ass' video filter)."""
+        if self._ass_filter is None:
+            try:
+                listing = subprocess.run(['ffmpeg', '-hide_banner', '-filters'],
+                                         capture_output=True, text=True).stdout
+            except FileNotFoundError:
+                listing = ''
+            self._ass_filter = any(line.split()[1:2] == ['ass'] for line in listing.splitlines())
+        return self._ass_filter
+    
+    def _video_codec_args(self) -> List[str]:
+        """High-quality encoder arguments for the selected H.264 encoder."""
+        encoder = self._detect_video_encoder()
+        
+        if encoder == 'h264_nvenc':
+            return ['-c:v', encoder, '-preset', 'p5', '-tune', 'hq', '-rc', 'vbr', '-cq', '20', '-b:v', '0']
+        if encoder == 'h264_videotoolbox':
+            return ['-c:v', encoder, '-b:v', '8M', '-allow_sw', '1']
+        if encoder == 'h264_qsv':
+            return ['-c:v', encoder, '-preset', 'slow', '-global_quality', '20']
+        
+        return [
+            '-c:v', 'libx264',
+            '-crf', '18',  # High quality
+            '-preset', 'slow',  # Better compression
+        ]
+    
+    def _create_video_from_frames(self, frames: Iterator[bytes], audio_path: str, output_path: str, duration: float,
+                                  frame_interval: float, subtitles_path: Optional[str] = None):
+        """Create video by piping raw frames to ffmpeg, then add audio with high quality."""
         try:
             print("🎥 Creating premium video...")
             
-            # Create video from frames with high quality
+            # Burn in ASS subtitles with libass while encoding
+            filter_args = []
+            if subtitles_path:
+                # Quoted for the filtergraph parser, with ':' escaped for the option parser
+                escaped = subtitles_path.replace('\\', '/').replace(':', '\\:')
+                filter_args = ['-vf', f"ass='{escaped}'"]
+            
+            # Encode raw rgb24 frames read from stdin with high quality
             temp_video = "temp_video.mp4"
-            subprocess.run([
+            cmd = [
                 'ffmpeg', '-y',
-                '-framerate', str(self.fps),
-                '-i', os.path.join(frames_dir, 'frame_%06d.png'),
-                '-c:v', 'libx264',
+                '-f', 'rawvideo',
+                '-pix_fmt', 'rgb24',
+                '-s', f'{self.width}x{self.height}',
+                '-r', str(self.fps),
+                '-i', '-',
+                *filter_args,
+                *self._video_codec_args(),
                 '-pix_fmt', 'yuv420p',
-                '-crf', '18',  # High quality
-                '-preset', 'slow',  # Better compression
                 temp_video
-            ], check=True)
+            ]
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, bufsize=1 << 20)
+            try:
+                for frame_bytes in frames:
+                    proc.stdin.write(frame_bytes)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its return code is checked below
+            finally:
+                proc.stdin.close()
+            
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
             
             # Combine video with audio
             print("🔊 Adding audio to video...")
@@ -525,15 +838,25 @@ class PremiumAnimatedVideoRenderer:
                 
         except subprocess.CalledProcessError as e:
             raise Exception(f"FFmpeg failed: {e}")
-    
-    def _cleanup_frames(self, frames_dir: str):
-        """Clean up temporary frame files."""
-        try:
-            for file in os.listdir(frames_dir):
-                os.remove(os.path.join(frames_dir, file))
-            os.rmdir(frames_dir)
-        except:
-            pass
+
+
+# Per-process state for parallel frame generation
+_premium_worker = None
+_premium_job = None
+
+
+def _premium_worker_init(job: Dict[str, Any]):
+    """Build a renderer once per worker process, sharing the parent's particles."""
+    global _premium_worker, _premium_job
+    width, height, fps = job['size']
+    _premium_worker = PremiumAnimatedVideoRenderer(width, height, fps)
+    _premium_worker._set_particle_state(job['particles'])
+    _premium_job = job
+
+
+def _premium_render_one(frame_num: int) -> bytes:
+    """Render a single frame inside a worker process."""
+    return _premium_worker._render_frame_bytes(_premium_job, frame_num)
 
 
 def main():
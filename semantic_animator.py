@@ -4,8 +4,11 @@ Builds intelligent animation overlay system that listens to narrated text and in
 """
 
 import os
+import sys
 import json
 import re
+import bisect
+import hashlib
 import subprocess
 import tempfile
 from typing import Dict, Any, List, Optional, Tuple
@@ -13,6 +16,62 @@ from pathlib import Path
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import math
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _fill_rect(buf: np.ndarray, box: Tuple[int, int, int, int], fill: Tuple[int, ...],
+               outline: Optional[Tuple[int, ...]] = None, width: int = 1):
+    """Fill an inclusive [x0, y0, x1, y1] box in an RGBA buffer like ImageDraw.rectangle."""
+    x0, y0, x1, y1 = box
+    # One packed 32-bit store per pixel instead of four byte stores
+    pixels = buf.view(np.uint32)[:, :, 0]
+    _store_rect(pixels, x0, y0, x1, y1, _pack_rgba(fill))
+    if outline is not None:
+        color = _pack_rgba(outline)
+        _store_rect(pixels, x0, y0, x1, y0 + width - 1, color)
+        _store_rect(pixels, x0, y1 - width + 1, x1, y1, color)
+        _store_rect(pixels, x0, y0, x0 + width - 1, y1, color)
+        _store_rect(pixels, x1 - width + 1, y0, x1, y1, color)
+
+
+def _pack_rgba(color: Tuple[int, ...]) -> int:
+    """Pack an RGB or RGBA color into the native-endian uint32 of its RGBA bytes."""
+    return int.from_bytes(bytes(color if len(color) == 4 else (*color, 255)), sys.byteorder)
+
+
+def _store_rect(pixels: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: int):
+    # ImageDraw writes straight into RGBA images without blending, so a clipped slice store matches
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1 + 1, pixels.shape[1]), min(y1 + 1, pixels.shape[0])
+    if x0 < x1 and y0 < y1:
+        pixels[y0:y1, x0:x1] = color
+
+
+def _blend_mask(buf: np.ndarray, x: int, y: int, mask: np.ndarray, color: Tuple[int, int, int]):
+    """Paint an L coverage mask at (x, y) in a solid color like ImageDraw.text on RGBA."""
+    mx0, my0 = max(0, -x), max(0, -y)
+    x0, y0 = x + mx0, y + my0
+    x1, y1 = min(x + mask.shape[1], buf.shape[1]), min(y + mask.shape[0], buf.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    
+    region = buf[y0:y1, x0:x1].astype(np.int32)
+    m = mask[my0:my0 + y1 - y0, mx0:mx0 + x1 - x0].astype(np.int32)[:, :, None]
+    m = np.repeat(m, 4, axis=2)
+    # Over fully transparent pixels Pillow takes the ink color outright and only blends alpha
+    m[:, :, :3] = np.where((m[:, :, :3] != 0) & (region[:, :, 3:] == 0), 255, m[:, :, :3])
+    
+    # Pillow's rounding BLEND macro, so the output is byte-identical to draw.text
+    tmp = (np.array((*color, 255), dtype=np.int32) - region) * m + 128
+    buf[y0:y1, x0:x1] = region + (((tmp >> 8) + tmp) >> 8)
+
 
 class SemanticAnimator:
     """Intelligent animation overlay system based on narration keywords."""
@@ -109,6 +168,21 @@ class SemanticAnimator:
             }
         }
         
+        # Flat (lowercase keyword, keyword, type, emoji, color) table in mapping order, so the
+        # trigger scan reads everything it emits from one row instead of the nested mapping
+        self._lower_keywords = [(kw.lower(), kw, anim_type, data['emoji'], data['color'])
+                                for anim_type, data in self.animation_mappings.items()
+                                for kw in data['keywords']]
+        
+        # Flat lowercase keyword list, scanned in one pass per segment
+        self._keywords = [row[0] for row in self._lower_keywords]
+        self._keyword_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for kw in self._keywords:
+                self._keyword_automaton.add_word(kw, kw)
+            self._keyword_automaton.make_automaton()
+        
         # Animation positions
         self.animation_positions = [
             (self.width - 250, 100),   # Top right
@@ -121,43 +195,107 @@ class SemanticAnimator:
             (self.width // 2 - 100, 500),  # Bottom center
         ]
         
+        # Animation type to drawing method
+        self._dispatch = {
+            'function_call': self._create_function_call_animation,
+            'loop_spin': self._create_loop_spin_animation,
+            'condition_check': self._create_condition_check_animation,
+            'recursion_tree': self._create_recursion_tree_animation,
+            'array_highlight': self._create_array_highlight_animation,
+            'swap_values': self._create_swap_values_animation,
+            'sort_animation': self._create_sort_animation,
+            'search_scan': self._create_search_scan_animation,
+            'stack_push_pop': self._create_stack_animation,
+            'queue_flow': self._create_queue_animation,
+            'pointer_move': self._create_pointer_animation,
+            'error_shake': self._create_error_animation,
+            'success_check': self._create_success_animation,
+        }
+        
+        # Pre-rendered animation sequences keyed by (type, color, duration)
+        self._frame_cache = {}
+        
+        # Narration triggers keyed by (narration digest, duration)
+        self._trigger_cache = {}
+        
+        # Start-time index over the last trigger list passed to active_at
+        self._active_index = None
+        
+        # Label fonts, opened once for every size the animations use
+        self._fonts = {size: self._load_font(size) for size in (10, 12, 16, 24)}
+        
+        # Label coverage masks keyed by (text, font size)
+        self._glyph_cache = {}
+        
     def analyze_narration(self, narration_text: str, duration: float) -> List[Dict[str, Any]]:
         """Analyze narration text and find animation triggers."""
-        triggers = []
-        
         if not narration_text:
-            return triggers
+            return []
+        
+        # Long narrations are keyed by a short digest rather than the text itself
+        key = (hashlib.blake2b(narration_text.encode('utf-8'), digest_size=8).digest(), duration)
+        triggers = self._trigger_cache.get(key)
+        if triggers is None:
+            triggers = self._find_triggers(narration_text, duration)
+            self._trigger_cache[key] = triggers
+        
+        # Hand out copies so callers cannot mutate the cached triggers
+        return [dict(trigger) for trigger in triggers]
+    
+    def _find_triggers(self, narration_text: str, duration: float) -> List[Dict[str, Any]]:
+        """Split the narration into ten-word segments and collect their animation triggers."""
+        triggers = []
         
         # Split narration into time segments
         words = narration_text.split()
         total_words = len(words)
         
+        # Every segment is a substring of the space-joined narration, so one scan
+        # of the whole text rules out narrations with no keywords at all
+        if not self._find_keywords(" ".join(words).lower()):
+            return triggers
+        
         # Create time segments
         segment_duration = duration / max(1, total_words // 10)  # One segment per 10 words
         
-        for i, word_group in enumerate([words[j:j+10] for j in range(0, total_words, 10)]):
-            segment_text = " ".join(word_group)
+        for i, j in enumerate(range(0, total_words, 10)):
+            segment_text = " ".join(words[j:j+10])
             start_time = i * segment_duration
             
-            # Check for animation triggers
-            for anim_type, anim_data in self.animation_mappings.items():
-                for keyword in anim_data['keywords']:
-                    if keyword.lower() in segment_text.lower():
-                        triggers.append({
-                            'type': anim_type,
-                            'start_time': start_time,
-                            'duration': self.animation_duration,
-                            'text': segment_text,
-                            'keyword': keyword,
-                            'emoji': anim_data['emoji'],
-                            'color': anim_data['color']
-                        })
-                        break  # Only trigger once per segment
+            # Collect every keyword present in the segment
+            found = self._find_keywords(segment_text.lower())
+            if not found:
+                continue
+            
+            # First matching keyword of each type triggers it, once per segment
+            triggered = set()
+            for kw_lower, keyword, anim_type, emoji, color in self._lower_keywords:
+                if kw_lower in found and anim_type not in triggered:
+                    triggered.add(anim_type)
+                    triggers.append({
+                        'type': anim_type,
+                        'start_time': start_time,
+                        'duration': self.animation_duration,
+                        'text': segment_text,
+                        'keyword': keyword,
+                        'emoji': emoji,
+                        'color': color
+                    })
         
         return triggers
     
+    def _find_keywords(self, text_lower: str) -> set:
+        """Return the set of lowercase keywords occurring in text_lower."""
+        if self._keyword_automaton is not None:
+            # Aho-Corasick reports overlapping hits too ('call' in 'call itself')
+            return {kw for _, kw in self._keyword_automaton.iter(text_lower)}
+        return {kw for kw in self._keywords if kw in text_lower}
+    
     def create_animation_overlay(self, trigger: Dict[str, Any], time: float) -> Optional[Image.Image]:
-        """Create animation overlay based on trigger type."""
+        """Create animation overlay based on trigger type.
+        
+        The returned image is shared with the frame cache and must not be modified.
+        """
         anim_type = trigger['type']
         anim_start = trigger['start_time']
         anim_duration = trigger['duration']
@@ -169,35 +307,83 @@ class SemanticAnimator:
         # Calculate animation progress
         progress = (time - anim_start) / anim_duration
         
-        # Create animation based on type
-        if anim_type == 'function_call':
-            return self._create_function_call_animation(trigger, progress)
-        elif anim_type == 'loop_spin':
-            return self._create_loop_spin_animation(trigger, progress)
-        elif anim_type == 'condition_check':
-            return self._create_condition_check_animation(trigger, progress)
-        elif anim_type == 'recursion_tree':
-            return self._create_recursion_tree_animation(trigger, progress)
-        elif anim_type == 'array_highlight':
-            return self._create_array_highlight_animation(trigger, progress)
-        elif anim_type == 'swap_values':
-            return self._create_swap_values_animation(trigger, progress)
-        elif anim_type == 'sort_animation':
-            return self._create_sort_animation(trigger, progress)
-        elif anim_type == 'search_scan':
-            return self._create_search_scan_animation(trigger, progress)
-        elif anim_type == 'stack_push_pop':
-            return self._create_stack_animation(trigger, progress)
-        elif anim_type == 'queue_flow':
-            return self._create_queue_animation(trigger, progress)
-        elif anim_type == 'pointer_move':
-            return self._create_pointer_animation(trigger, progress)
-        elif anim_type == 'error_shake':
-            return self._create_error_animation(trigger, progress)
-        elif anim_type == 'success_check':
-            return self._create_success_animation(trigger, progress)
-        
-        return None
+        # Every animation is a pure function of (type, color, progress), so the
+        # whole sequence is rendered once at the video frame rate and reused
+        key = self._sequence_key(trigger)
+        frames = self._frame_cache.get(key)
+        if frames is None:
+            frames = self._prerender(trigger, self._frame_count(anim_duration))
+            self._frame_cache[key] = frames
+        
+        return frames[int(round(progress * (len(frames) - 1)))]
+    
+    def prewarm(self, triggers: List[Dict[str, Any]]):
+        """Pre-render every animation sequence the triggers need, spread across cores."""
+        pending = {}
+        for trigger in triggers:
+            key = self._sequence_key(trigger)
+            if key not in self._frame_cache and trigger['type'] in self._dispatch:
+                pending.setdefault(key, trigger)
+        
+        # Sequences are independent, so each distinct one can render in its own process
+        workers = min(os.cpu_count() or 1, len(pending))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_animator_worker_init,
+                                         initargs=((self.width, self.height, self.fps),)) as executor:
+                    keys = list(pending)
+                    for key, frames in zip(keys, executor.map(_animator_render_sequence, keys)):
+                        self._frame_cache[key] = frames
+                return
+            except (OSError, BrokenProcessPool) as e:
+                print(f"⚠️ Parallel animation pre-render failed ({e}), rendering serially")
+        
+        for key, trigger in pending.items():
+            if key not in self._frame_cache:
+                self._frame_cache[key] = self._prerender(trigger, self._frame_count(trigger['duration']))
+    
+    def _sequence_key(self, trigger: Dict[str, Any]) -> Tuple[str, Tuple[int, ...], float]:
+        """Return the frame cache key shared by every trigger with the same rendered sequence."""
+        return (trigger['type'], tuple(trigger['color']), trigger['duration'])
+    
+    def _frame_count(self, duration: float) -> int:
+        """Return how many frames a sequence of the given duration spans at the video frame rate."""
+        return max(2, int(round(self.fps * duration)))
+    
+    def _prerender(self, trigger: Dict[str, Any], frame_count: int) -> List[Optional[Image.Image]]:
+        """Render the full animation sequence for a trigger at evenly spaced progress values."""
+        return [self._render_animation(trigger, i / (frame_count - 1)) for i in range(frame_count)]
+    
+    def _render_animation(self, trigger: Dict[str, Any], progress: float) -> Optional[Image.Image]:
+        """Draw a single animation frame for the trigger at the given progress."""
+        render = self._dispatch.get(trigger['type'])
+        return render(trigger, progress) if render else None
+    
+    def _load_font(self, size: int) -> ImageFont.ImageFont:
+        """Load the label font at the given size, falling back to PIL's default font."""
+        try:
+            return ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
+        except:
+            return ImageFont.load_default()
+    
+    def _glyph(self, text: str, size: int) -> Tuple[np.ndarray, int, int]:
+        """Return the L coverage mask of a label with its (left, top) offset from the text origin."""
+        key = (text, size)
+        glyph = self._glyph_cache.get(key)
+        if glyph is None:
+            font = self._fonts[size]
+            left, top, right, bottom = font.getbbox(text)
+            mask = Image.new('L', (right - left, bottom - top), 0)
+            ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font)
+            glyph = (np.asarray(mask), left, top)
+            self._glyph_cache[key] = glyph
+        
+        return glyph
+    
+    def _text_size(self, text: str, size: int) -> Tuple[int, int]:
+        """Return the (width, height) of a label's bounding box, measured once per (text, size)."""
+        mask = self._glyph(text, size)[0]
+        return mask.shape[1], mask.shape[0]
     
     def _create_function_call_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create function call animation."""
@@ -222,14 +408,10 @@ class SemanticAnimator:
                       fill=fill_color, outline=(255, 255, 255), width=2)
         
         # Function text
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 16)
-        except:
-            font = ImageFont.load_default()
+        font = self._fonts[16]
         
         text = "f()"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
+        text_width, _ = self._text_size(text, 16)
         text_x = center_x - text_width // 2
         text_y = center_y - 8
         
@@ -315,15 +497,10 @@ class SemanticAnimator:
         draw.polygon(diamond_points, fill=fill_color, outline=(255, 255, 255), width=2)
         
         # Question mark
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-        except:
-            font = ImageFont.load_default()
+        font = self._fonts[24]
         
         text = "?"
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+        text_width, text_height = self._text_size(text, 24)
         text_x = center_x - text_width // 2
         text_y = center_y - text_height // 2
         
@@ -343,40 +520,39 @@ class SemanticAnimator:
         max_depth = 3
         current_depth = int(progress * max_depth)
         
+        # Node fill and connection colors only depend on progress
         color = trigger['color']
+        node_color = (*color, int(255 * (0.5 + 0.5 * progress)))
+        line_color = (255, 255, 255, int(255 * progress))
         
+        parent_left = None
         for depth in range(current_depth + 1):
             nodes_at_depth = 2 ** depth
             y_pos = center_y - 80 + depth * 40
+            node_size = 20 - depth * 3
+            left = center_x - (nodes_at_depth - 1) * 20 // 2
             
             for i in range(nodes_at_depth):
-                x_pos = center_x - (nodes_at_depth - 1) * 20 // 2 + i * 40
+                x_pos = left + i * 40
                 
                 # Node
-                node_size = 20 - depth * 3
-                alpha = int(255 * (0.5 + 0.5 * progress))
-                node_color = (*color, alpha)
-                
                 draw.ellipse([x_pos - node_size, y_pos - node_size, 
                             x_pos + node_size, y_pos + node_size], 
                            fill=node_color, outline=(255, 255, 255), width=1)
                 
                 # Connection lines
                 if depth > 0:
-                    parent_i = i // 2
-                    parent_y = y_pos - 40
-                    parent_x = center_x - (2 ** (depth - 1) - 1) * 20 // 2 + parent_i * 40
-                    
-                    line_alpha = int(255 * progress)
-                    draw.line([parent_x, parent_y, x_pos, y_pos], 
-                             fill=(255, 255, 255, line_alpha), width=2)
+                    parent_x = parent_left + (i // 2) * 40
+                    draw.line([parent_x, y_pos - 40, x_pos, y_pos], 
+                             fill=line_color, width=2)
+            
+            parent_left = left
         
         return img
     
     def _create_array_highlight_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create array highlight animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -397,28 +573,20 @@ class SemanticAnimator:
             # Highlight current element
             if i == int(progress * array_size):
                 alpha = int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 4)))
-                fill_color = (*color, alpha)
-                draw.rectangle([x, y, x + box_width - 2, y + box_height], 
-                              fill=fill_color, outline=(255, 255, 255), width=2)
+                _fill_rect(buf, (x, y, x + box_width - 2, y + box_height), 
+                           (*color, alpha), (255, 255, 255), 2)
             else:
-                draw.rectangle([x, y, x + box_width - 2, y + box_height], 
-                              fill=(50, 50, 50, 100), outline=(100, 100, 100), width=1)
+                _fill_rect(buf, (x, y, x + box_width - 2, y + box_height), 
+                           (50, 50, 50, 100), (100, 100, 100), 1)
             
             # Element value
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-            except:
-                font = ImageFont.load_default()
-            
-            value = str(i + 1)
-            bbox = draw.textbbox((0, 0), value, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_x = x + (box_width - text_width) // 2
+            mask, left, top = self._glyph(str(i + 1), 12)
+            text_x = x + (box_width - mask.shape[1]) // 2
             text_y = y + (box_height - 12) // 2
             
-            draw.text((text_x, text_y), value, fill=(255, 255, 255), font=font)
+            _blend_mask(buf, text_x + left, text_y + top, mask, (255, 255, 255))
         
-        return img
+        return Image.fromarray(buf)
     
     def _create_swap_values_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create swap values animation."""
@@ -460,10 +628,7 @@ class SemanticAnimator:
                       fill=fill_color, outline=(255, 255, 255), width=2)
         
         # Box values
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 16)
-        except:
-            font = ImageFont.load_default()
+        font = self._fonts[16]
         
         draw.text((box1_x + 10, box1_y + 10), "A", fill=(255, 255, 255), font=font)
         draw.text((box2_x + 10, box2_y + 10), "B", fill=(255, 255, 255), font=font)
@@ -472,8 +637,7 @@ class SemanticAnimator:
     
     def _create_sort_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create sort animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -485,7 +649,9 @@ class SemanticAnimator:
         start_x = center_x - (len(numbers) * box_width) // 2
         start_y = center_y - box_height // 2
         
+        # Highlight color depends only on progress, so it is built once per frame
         color = trigger['color']
+        highlight = (*color, int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 4))))
         
         # Animate sorting
         current_step = int(progress * len(numbers))
@@ -495,35 +661,23 @@ class SemanticAnimator:
             y = start_y
             
             # Highlight current element being processed
-            if i == current_step:
-                alpha = int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 4)))
-                fill_color = (*color, alpha)
-            else:
-                fill_color = (50, 50, 50, 150)
+            fill_color = highlight if i == current_step else (50, 50, 50, 150)
             
-            draw.rectangle([x, y, x + box_width - 2, y + box_height], 
-                          fill=fill_color, outline=(255, 255, 255), width=1)
+            _fill_rect(buf, (x, y, x + box_width - 2, y + box_height), 
+                       fill_color, (255, 255, 255), 1)
             
             # Number
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-            except:
-                font = ImageFont.load_default()
-            
-            value = str(num)
-            bbox = draw.textbbox((0, 0), value, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_x = x + (box_width - text_width) // 2
+            mask, left, top = self._glyph(str(num), 12)
+            text_x = x + (box_width - mask.shape[1]) // 2
             text_y = y + (box_height - 12) // 2
             
-            draw.text((text_x, text_y), value, fill=(255, 255, 255), font=font)
+            _blend_mask(buf, text_x + left, text_y + top, mask, (255, 255, 255))
         
-        return img
+        return Image.fromarray(buf)
     
     def _create_search_scan_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create search scan animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -535,7 +689,9 @@ class SemanticAnimator:
         start_x = center_x - (len(numbers) * box_width) // 2
         start_y = center_y - box_height // 2
         
+        # Highlight color depends only on progress, so it is built once per frame
         color = trigger['color']
+        highlight = (*color, int(255 * (0.5 + 0.5 * math.sin(progress * math.pi * 3))))
         
         # Scanning effect
         scan_position = int(progress * len(numbers))
@@ -545,43 +701,33 @@ class SemanticAnimator:
             y = start_y
             
             # Highlight scanned elements
-            if i <= scan_position:
-                alpha = int(255 * (0.5 + 0.5 * math.sin(progress * math.pi * 3)))
-                fill_color = (*color, alpha)
-            else:
-                fill_color = (50, 50, 50, 100)
+            fill_color = highlight if i <= scan_position else (50, 50, 50, 100)
             
-            draw.rectangle([x, y, x + box_width - 2, y + box_height], 
-                          fill=fill_color, outline=(255, 255, 255), width=1)
+            _fill_rect(buf, (x, y, x + box_width - 2, y + box_height), 
+                       fill_color, (255, 255, 255), 1)
             
             # Number
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 10)
-            except:
-                font = ImageFont.load_default()
-            
-            value = str(num)
-            bbox = draw.textbbox((0, 0), value, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_x = x + (box_width - text_width) // 2
+            mask, left, top = self._glyph(str(num), 10)
+            text_x = x + (box_width - mask.shape[1]) // 2
             text_y = y + (box_height - 10) // 2
             
-            draw.text((text_x, text_y), value, fill=(255, 255, 255), font=font)
+            _blend_mask(buf, text_x + left, text_y + top, mask, (255, 255, 255))
+        
+        img = Image.fromarray(buf)
         
         # Search pointer
         if scan_position < len(numbers):
             pointer_x = start_x + scan_position * box_width + box_width // 2
             pointer_y = start_y - 10
             
-            draw.polygon([(pointer_x, pointer_y), (pointer_x - 5, pointer_y - 10), 
-                         (pointer_x + 5, pointer_y - 10)], fill=(255, 255, 0))
+            ImageDraw.Draw(img).polygon([(pointer_x, pointer_y), (pointer_x - 5, pointer_y - 10), 
+                                         (pointer_x + 5, pointer_y - 10)], fill=(255, 255, 0))
         
         return img
     
     def _create_stack_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create stack push/pop animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -592,13 +738,14 @@ class SemanticAnimator:
         stack_x = center_x - stack_width // 2
         stack_y = center_y + 20
         
-        draw.rectangle([stack_x, stack_y, stack_x + stack_width, stack_y + stack_height], 
-                      fill=(50, 50, 50, 100), outline=(255, 255, 255), width=2)
+        _fill_rect(buf, (stack_x, stack_y, stack_x + stack_width, stack_y + stack_height), 
+                   (50, 50, 50, 100), (255, 255, 255), 2)
         
         # Stack elements
         elements = ['A', 'B', 'C', 'D']
         element_height = 25
         color = trigger['color']
+        fill_color = (*color, int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 2))))
         
         if progress < 0.5:
             # Push animation
@@ -611,26 +758,18 @@ class SemanticAnimator:
             element_y = stack_y + stack_height - (i + 1) * element_height
             element_x = stack_x + 5
             
-            alpha = int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 2)))
-            fill_color = (*color, alpha)
-            
-            draw.rectangle([element_x, element_y, element_x + stack_width - 10, element_y + element_height - 2], 
-                          fill=fill_color, outline=(255, 255, 255), width=1)
+            _fill_rect(buf, (element_x, element_y, element_x + stack_width - 10, element_y + element_height - 2), 
+                       fill_color, (255, 255, 255), 1)
             
             # Element label
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-            except:
-                font = ImageFont.load_default()
-            
-            draw.text((element_x + 5, element_y + 5), elements[i], fill=(255, 255, 255), font=font)
+            mask, left, top = self._glyph(elements[i], 12)
+            _blend_mask(buf, element_x + 5 + left, element_y + 5 + top, mask, (255, 255, 255))
         
-        return img
+        return Image.fromarray(buf)
     
     def _create_queue_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create queue flow animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -641,13 +780,14 @@ class SemanticAnimator:
         queue_x = center_x - queue_width // 2
         queue_y = center_y
         
-        draw.rectangle([queue_x, queue_y, queue_x + queue_width, queue_y + queue_height], 
-                      fill=(50, 50, 50, 100), outline=(255, 255, 255), width=2)
+        _fill_rect(buf, (queue_x, queue_y, queue_x + queue_width, queue_y + queue_height), 
+                   (50, 50, 50, 100), (255, 255, 255), 2)
         
         # Queue elements
         elements = ['1', '2', '3', '4']
         element_width = 25
         color = trigger['color']
+        fill_color = (*color, int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 2))))
         
         # Animate elements moving through queue
         offset = int(progress * (queue_width - element_width))
@@ -657,26 +797,18 @@ class SemanticAnimator:
             element_y = queue_y + 5
             
             if element_x >= queue_x and element_x <= queue_x + queue_width - element_width:
-                alpha = int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 2)))
-                fill_color = (*color, alpha)
-                
-                draw.rectangle([element_x, element_y, element_x + element_width - 2, element_y + 30], 
-                              fill=fill_color, outline=(255, 255, 255), width=1)
+                _fill_rect(buf, (element_x, element_y, element_x + element_width - 2, element_y + 30), 
+                           fill_color, (255, 255, 255), 1)
                 
                 # Element label
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
-                except:
-                    font = ImageFont.load_default()
-                
-                draw.text((element_x + 5, element_y + 8), element, fill=(255, 255, 255), font=font)
+                mask, left, top = self._glyph(element, 12)
+                _blend_mask(buf, element_x + 5 + left, element_y + 8 + top, mask, (255, 255, 255))
         
-        return img
+        return Image.fromarray(buf)
     
     def _create_pointer_animation(self, trigger: Dict[str, Any], progress: float) -> Image.Image:
         """Create pointer move animation."""
-        img = Image.new('RGBA', (self.animation_size, self.animation_size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        buf = np.zeros((self.animation_size, self.animation_size, 4), dtype=np.uint8)
         
         center_x = self.animation_size // 2
         center_y = self.animation_size // 2
@@ -694,22 +826,17 @@ class SemanticAnimator:
             x = start_x + i * cell_size
             y = start_y
             
-            draw.rectangle([x, y, x + cell_size - 2, y + cell_size], 
-                          fill=(50, 50, 50, 100), outline=(100, 100, 100), width=1)
+            _fill_rect(buf, (x, y, x + cell_size - 2, y + cell_size), 
+                       (50, 50, 50, 100), (100, 100, 100), 1)
             
             # Cell address
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 10)
-            except:
-                font = ImageFont.load_default()
-            
-            addr = f"0x{i:02X}"
-            bbox = draw.textbbox((0, 0), addr, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_x = x + (cell_size - text_width) // 2
+            mask, left, top = self._glyph(f"0x{i:02X}", 10)
+            text_x = x + (cell_size - mask.shape[1]) // 2
             text_y = y + 5
             
-            draw.text((text_x, text_y), addr, fill=(200, 200, 200), font=font)
+            _blend_mask(buf, text_x + left, text_y + top, mask, (200, 200, 200))
+        
+        img = Image.fromarray(buf)
         
         # Moving pointer
         pointer_pos = int(progress * num_cells)
@@ -720,8 +847,8 @@ class SemanticAnimator:
         alpha = int(255 * (0.7 + 0.3 * math.sin(progress * math.pi * 3)))
         pointer_color = (*color, alpha)
         
-        draw.polygon([(pointer_x, pointer_y), (pointer_x - 8, pointer_y - 15), 
-                     (pointer_x + 8, pointer_y - 15)], fill=pointer_color)
+        ImageDraw.Draw(img).polygon([(pointer_x, pointer_y), (pointer_x - 8, pointer_y - 15), 
+                                     (pointer_x + 8, pointer_y - 15)], fill=pointer_color)
         
         return img
     
@@ -792,13 +919,48 @@ class SemanticAnimator:
         
         return img
     
+    def active_at(self, triggers: List[Dict[str, Any]], time: float) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return (index, trigger) pairs, in list order, for the triggers active at the given time.
+        
+        The start-time index is rebuilt whenever a different or resized list is passed in, so
+        triggers must not be edited in place between calls.
+        """
+        index = self._active_index
+        if index is None or index[0] is not triggers or len(index[2]) != len(triggers):
+            order = sorted(range(len(triggers)), key=lambda i: triggers[i]['start_time'])
+            starts = [triggers[i]['start_time'] for i in order]
+            longest = max((trigger['duration'] for trigger in triggers), default=0.0)
+            index = self._active_index = (triggers, starts, order, longest)
+        
+        # Only triggers starting within the longest duration before time can still be running;
+        # the extra frame of slack only widens the candidates, the exact check is below
+        _, starts, order, longest = index
+        lo = bisect.bisect_left(starts, time - longest - 1.0 / self.fps)
+        hi = bisect.bisect_right(starts, time)
+        
+        active = []
+        for i in sorted(order[lo:hi]):
+            trigger = triggers[i]
+            if time <= trigger['start_time'] + trigger['duration']:
+                active.append((i, trigger))
+        return active
+    
     def apply_animations_to_frame(self, base_frame: Image.Image, triggers: List[Dict[str, Any]], 
-                                time: float) -> Image.Image:
-        """Apply animation overlays to a base frame."""
-        result_frame = base_frame.copy()
+                                time: float, in_place: bool = False) -> Image.Image:
+        """Apply animation overlays to a base frame.
+        
+        When no animation is active the base frame itself is returned rather than a copy.
+        Callers that own the frame and discard it afterwards can pass ``in_place=True``
+        to draw straight onto it instead of onto a fresh full-frame copy.
+        """
+        active = self.active_at(triggers, time)
+        if not active:
+            return base_frame
+        
+        result_frame = base_frame if in_place else base_frame.copy()
         
         # Apply each active animation
-        for i, trigger in enumerate(triggers):
+        for i, trigger in active:
             animation = self.create_animation_overlay(trigger, time)
             if animation:
                 # Position animation
@@ -811,6 +973,23 @@ class SemanticAnimator:
         return result_frame
 
 
+# Per-process animator for parallel pre-rendering
+_animator_worker = None
+
+
+def _animator_worker_init(size: Tuple[int, int, int]):
+    """Build an animator once per worker process."""
+    global _animator_worker
+    _animator_worker = SemanticAnimator(*size)
+
+
+def _animator_render_sequence(key: Tuple[str, Tuple[int, ...], float]) -> List[Optional[Image.Image]]:
+    """Render one animation sequence inside a worker process."""
+    anim_type, color, duration = key
+    trigger = {'type': anim_type, 'color': color, 'duration': duration}
+    return _animator_worker._prerender(trigger, _animator_worker._frame_count(duration))
+
+
 def main():
     """Test the semantic animator."""
     animator = SemanticAnimator()
@@ -9,6 +9,9 @@ import os
 import json
 import math
 import re
+import functools
+import numpy as np
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import subprocess
@@ -20,160 +23,184 @@ except ImportError:
     PIL_AVAILABLE = False
 
 
+@functools.lru_cache(maxsize=None)
+def _load_font(size: int):
+    """Open Arial at the given size once per process, falling back to PIL's default font."""
+    try:
+        return ImageFont.truetype("/System/Library/Fonts/Arial.ttf", size)
+    except:
+        return ImageFont.load_default()
+
+
+# Keyword to emoji mapping, shared read-only by every SubtitleOverlay
+_KEYWORD_EMOJI = MappingProxyType({
+    # Programming concepts
+    'function': '⚙️',
+    'def': '⚙️',
+    'return': '↩️',
+    'if': '❓',
+    'else': '🔄',
+    'for': '🔄',
+    'while': '🔄',
+    'loop': '🔄',
+    'array': '📊',
+    'list': '📋',
+    'dictionary': '📚',
+    'variable': '📝',
+    'print': '🖨️',
+    'input': '⌨️',
+    'output': '📤',
+    'swap': '🔄',
+    'sort': '📊',
+    'search': '🔍',
+    'find': '🔍',
+    'calculate': '🧮',
+    'compute': '💻',
+    'algorithm': '🧠',
+    'recursion': '🔄',
+    'iteration': '🔄',
+    'condition': '❓',
+    'boolean': '✅',
+    'true': '✅',
+    'false': '❌',
+    'null': '🚫',
+    'error': '⚠️',
+    'exception': '🚨',
+    'try': '🛡️',
+    'catch': '🎯',
+    'finally': '🏁',
+
+    # Mathematical concepts
+    'add': '➕',
+    'subtract': '➖',
+    'multiply': '✖️',
+    'divide': '➗',
+    'sum': '📊',
+    'total': '📊',
+    'count': '🔢',
+    'number': '🔢',
+    'value': '💎',
+    'result': '🎯',
+    'answer': '💡',
+    'solution': '💡',
+    'formula': '📐',
+    'equation': '📐',
+    'math': '🧮',
+    'factorial': '🔢',
+    'fibonacci': '🐚',
+    'prime': '🔢',
+    'even': '🔢',
+    'odd': '🔢',
+
+    # Data structures
+    'stack': '📚',
+    'queue': '📋',
+    'tree': '🌳',
+    'graph': '🕸️',
+    'node': '🔗',
+    'pointer': '👆',
+    'reference': '🔗',
+    'object': '📦',
+    'class': '🏗️',
+    'method': '⚙️',
+    'property': '📋',
+    'attribute': '🏷️',
+
+    # Actions and processes
+    'create': '✨',
+    'build': '🏗️',
+    'construct': '🔨',
+    'initialize': '🚀',
+    'setup': '⚙️',
+    'configure': '🔧',
+    'process': '⚙️',
+    'execute': '▶️',
+    'run': '🏃',
+    'start': '🚀',
+    'stop': '⏹️',
+    'pause': '⏸️',
+    'finish': '🏁',
+    'complete': '✅',
+    'done': '✅',
+    'success': '🎉',
+    'fail': '💥',
+    'break': '💔',
+    'continue': '🔄',
+
+    # Common words
+    'now': '⏰',
+    'next': '➡️',
+    'then': '➡️',
+    'first': '1️⃣',
+    'second': '2️⃣',
+    'third': '3️⃣',
+    'last': '🔚',
+    'begin': '🚀',
+    'end': '🏁',
+    'check': '✅',
+    'verify': '🔍',
+    'test': '🧪',
+    'debug': '🐛',
+    'fix': '🔧',
+    'solve': '💡',
+    'understand': '🧠',
+    'learn': '📚',
+    'explain': '💬',
+    'show': '👁️',
+    'display': '📺',
+    'see': '👁️',
+    'look': '👁️',
+    'watch': '👁️',
+    'observe': '👁️',
+    'notice': '👁️',
+    'remember': '🧠',
+    'forget': '🧠',
+    'think': '🤔',
+    'know': '💡',
+    'guess': '🤔',
+    'assume': '🤔',
+    'suppose': '🤔',
+    'imagine': '🤔',
+    'consider': '🤔',
+    'decide': '🤔',
+    'choose': '🤔',
+    'select': '🤔',
+    'pick': '🤔',
+    'want': '💭',
+    'need': '💭',
+    'must': '💭',
+    'should': '💭',
+    'could': '💭',
+    'would': '💭',
+    'can': '💭',
+    'will': '💭',
+    'may': '💭',
+    'might': '💭',
+    'shall': '💭',
+})
+
+
+def _ass_time(seconds: float) -> str:
+    """Format seconds as an ASS timestamp (H:MM:SS.cc)."""
+    centiseconds = int(round(max(0.0, seconds) * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+
 class SubtitleOverlay:
     """Handles subtitle generation and emoji overlays."""
     
+    # Punctuation stripped from words before keyword lookup
+    _NON_WORD_RE = re.compile(r'[^\w]')
+    
+    # Bound on the class rather than per instance, which also keeps overlays picklable
+    # for the premium renderer's worker processes (mappingproxy itself is not)
+    keyword_emoji_map = _KEYWORD_EMOJI
+    
     def __init__(self):
         """Initialize the subtitle overlay system."""
-        # Keyword to emoji mapping
-        self.keyword_emoji_map = {
-            # Programming concepts
-            'function': '⚙️',
-            'def': '⚙️',
-            'return': '↩️',
-            'if': '❓',
-            'else': '🔄',
-            'for': '🔄',
-            'while': '🔄',
-            'loop': '🔄',
-            'array': '📊',
-            'list': '📋',
-            'dictionary': '📚',
-            'variable': '📝',
-            'print': '🖨️',
-            'input': '⌨️',
-            'output': '📤',
-            'swap': '🔄',
-            'sort': '📊',
-            'search': '🔍',
-            'find': '🔍',
-            'calculate': '🧮',
-            'compute': '💻',
-            'algorithm': '🧠',
-            'recursion': '🔄',
-            'iteration': '🔄',
-            'condition': '❓',
-            'boolean': '✅',
-            'true': '✅',
-            'false': '❌',
-            'null': '🚫',
-            'error': '⚠️',
-            'exception': '🚨',
-            'try': '🛡️',
-            'catch': '🎯',
-            'finally': '🏁',
-            
-            # Mathematical concepts
-            'add': '➕',
-            'subtract': '➖',
-            'multiply': '✖️',
-            'divide': '➗',
-            'sum': '📊',
-            'total': '📊',
-            'count': '🔢',
-            'number': '🔢',
-            'value': '💎',
-            'result': '🎯',
-            'answer': '💡',
-            'solution': '💡',
-            'formula': '📐',
-            'equation': '📐',
-            'math': '🧮',
-            'calculate': '🧮',
-            'factorial': '🔢',
-            'fibonacci': '🐚',
-            'prime': '🔢',
-            'even': '🔢',
-            'odd': '🔢',
-            
-            # Data structures
-            'stack': '📚',
-            'queue': '📋',
-            'tree': '🌳',
-            'graph': '🕸️',
-            'node': '🔗',
-            'pointer': '👆',
-            'reference': '🔗',
-            'object': '📦',
-            'class': '🏗️',
-            'method': '⚙️',
-            'property': '📋',
-            'attribute': '🏷️',
-            
-            # Actions and processes
-            'create': '✨',
-            'build': '🏗️',
-            'construct': '🔨',
-            'initialize': '🚀',
-            'setup': '⚙️',
-            'configure': '🔧',
-            'process': '⚙️',
-            'execute': '▶️',
-            'run': '🏃',
-            'start': '🚀',
-            'stop': '⏹️',
-            'pause': '⏸️',
-            'continue': '▶️',
-            'finish': '🏁',
-            'complete': '✅',
-            'done': '✅',
-            'success': '🎉',
-            'fail': '💥',
-            'break': '💔',
-            'continue': '🔄',
-            
-            # Common words
-            'now': '⏰',
-            'next': '➡️',
-            'then': '➡️',
-            'first': '1️⃣',
-            'second': '2️⃣',
-            'third': '3️⃣',
-            'last': '🔚',
-            'begin': '🚀',
-            'end': '🏁',
-            'check': '✅',
-            'verify': '🔍',
-            'test': '🧪',
-            'debug': '🐛',
-            'fix': '🔧',
-            'solve': '💡',
-            'understand': '🧠',
-            'learn': '📚',
-            'explain': '💬',
-            'show': '👁️',
-            'display': '📺',
-            'see': '👁️',
-            'look': '👁️',
-            'watch': '👁️',
-            'observe': '👁️',
-            'notice': '👁️',
-            'remember': '🧠',
-            'forget': '🧠',
-            'think': '🤔',
-            'know': '💡',
-            'guess': '🤔',
-            'assume': '🤔',
-            'suppose': '🤔',
-            'imagine': '🤔',
-            'consider': '🤔',
-            'decide': '🤔',
-            'choose': '🤔',
-            'select': '🤔',
-            'pick': '🤔',
-            'want': '💭',
-            'need': '💭',
-            'must': '💭',
-            'should': '💭',
-            'could': '💭',
-            'would': '💭',
-            'can': '💭',
-            'will': '💭',
-            'may': '💭',
-            'might': '💭',
-            'shall': '💭',
-        }
-        
         # Emoji overlay positions and animations
         self.emoji_positions = [
             (100, 100), (200, 150), (300, 200), (400, 250),
@@ -181,6 +208,13 @@ class SubtitleOverlay:
             (900, 500), (1000, 550), (1100, 600), (1200, 650)
         ]
         self.current_position = 0
+        
+        # Wrapped subtitle layouts and full-opacity layers keyed by (text, width, height)
+        self._layout_cache = {}
+        self._steady_layers = {}
+        
+        # Emoji coverage masks, rasterized once per emoji
+        self._emoji_sprites = {}
     
     def process_narration(self, narration_text: str) -> List[Dict[str, Any]]:
         """
@@ -200,16 +234,12 @@ class SubtitleOverlay:
         current_time = 0.0
         
         for sentence in sentences:
-            # Add emojis to the sentence
-            enhanced_sentence = self._add_emojis_to_sentence(sentence)
+            # Add emojis and find keywords for emoji overlays in one pass over the words
+            enhanced_sentence, keywords, emojis, word_count = self._process_sentence(sentence)
             
             # Estimate duration (roughly 2.5 words per second)
-            word_count = len(sentence.split())
             duration = max(1.0, word_count / 2.5)
             
-            # Find keywords for emoji overlays
-            keywords = self._find_keywords(sentence)
-            
             subtitle_segments.append({
                 'text': enhanced_sentence,
                 'original_text': sentence,
@@ -217,41 +247,35 @@ class SubtitleOverlay:
                 'duration': duration,
                 'end_time': current_time + duration,
                 'keywords': keywords,
-                'emojis': [self.keyword_emoji_map.get(kw.lower(), '') for kw in keywords]
+                'emojis': emojis
             })
             
             current_time += duration
         
         return subtitle_segments
     
-    def _add_emojis_to_sentence(self, sentence: str) -> str:
-        """Add emojis to a sentence based on keywords."""
+    def _process_sentence(self, sentence: str) -> Tuple[str, List[str], List[str], int]:
+        """Add emojis to a sentence and collect its keywords, emojis and word count."""
         words = sentence.split()
         enhanced_words = []
+        keywords = []
+        emojis = []
         
         for word in words:
-            # Clean the word (remove punctuation)
-            clean_word = re.sub(r'[^\w]', '', word.lower())
+            # Clean the word (remove punctuation); plain alphanumeric words need no regex pass
+            clean_word = word.lower()
+            if not clean_word.isalnum():
+                clean_word = self._NON_WORD_RE.sub('', clean_word)
             
-            if clean_word in self.keyword_emoji_map:
-                emoji = self.keyword_emoji_map[clean_word]
+            emoji = self.keyword_emoji_map.get(clean_word)
+            if emoji is not None:
                 enhanced_words.append(f"{word} {emoji}")
+                keywords.append(clean_word)
+                emojis.append(emoji)
             else:
                 enhanced_words.append(word)
         
-        return ' '.join(enhanced_words)
-    
-    def _find_keywords(self, sentence: str) -> List[str]:
-        """Find keywords in a sentence for emoji overlays."""
-        words = sentence.split()
-        keywords = []
-        
-        for word in words:
-            clean_word = re.sub(r'[^\w]', '', word.lower())
-            if clean_word in self.keyword_emoji_map:
-                keywords.append(clean_word)
-        
-        return keywords
+        return ' '.join(enhanced_words), keywords, emojis, len(words)
     
     def create_subtitle_frame(self, subtitle_segment: Dict[str, Any], 
                             width: int, height: int, time: float) -> Optional[Image.Image]:
@@ -267,6 +291,19 @@ class SubtitleOverlay:
         Returns:
             PIL Image with subtitle overlay, or None if not needed
         """
+        layer = self.create_subtitle_layer(subtitle_segment, width, height, time)
+        return self._layer_to_frame(layer, width, height)
+    
+    def create_subtitle_layer(self, subtitle_segment: Dict[str, Any], width: int, height: int,
+                              time: float) -> Optional[Tuple[Image.Image, Tuple[int, int]]]:
+        """
+        Create only the region of the subtitle overlay that has content.
+        
+        The layer may be shared between frames and must not be modified.
+        
+        Returns:
+            (RGBA layer, (x, y) position in the frame), or None if not needed
+        """
         if not PIL_AVAILABLE:
             return None
         
@@ -285,24 +322,61 @@ class SubtitleOverlay:
         else:
             alpha = 1.0
         
-        # Create subtitle image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        # Between the fades every frame is identical, so that layer is drawn once and shared
+        key = (subtitle_segment['text'], width, height)
+        if key not in self._steady_layers:
+            self._steady_layers[key] = self._render_subtitle_layer(subtitle_segment['text'], width, height)
+        layer = self._steady_layers[key]
+        if layer is None or alpha == 1.0:
+            return layer
+        
+        # Fading frames scale the steady layer's alpha channel instead of redrawing the text
+        img, origin = layer
+        faded = np.array(img)
+        faded[:, :, 3] = faded[:, :, 3] * np.float32(alpha)
+        return Image.fromarray(faded), origin
+    
+    def _render_subtitle_layer(self, text: str, width: int,
+                               height: int) -> Optional[Tuple[Image.Image, Tuple[int, int]]]:
+        """Draw the subtitle backgrounds and lines at full opacity."""
+        # Wrapping and placement only depend on the text and frame size
+        layout = self._subtitle_layout(text, width, height)
+        if layout is None:
+            return None
+        placed, boxes = layout
+        font = _load_font(32)
+        
+        origin, img = self._new_layer(boxes, width, height)
+        if img is None:
+            return None
+        ox, oy = origin
         draw = ImageDraw.Draw(img)
         
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 32)
-        except:
-            font = ImageFont.load_default()
+        for line, line_x, line_y, bg_rect in placed:
+            # Draw background rectangle
+            draw.rectangle([bg_rect[0] - ox, bg_rect[1] - oy, bg_rect[2] - ox, bg_rect[3] - oy], fill=(0, 0, 0, 180))
+            
+            # Draw text
+            draw.text((line_x - ox, line_y - oy), line, fill=(255, 255, 255, 255), font=font)
+        
+        return img, origin
+    
+    def _subtitle_layout(self, text: str, width: int, height: int) -> Optional[Tuple[List[tuple], List[tuple]]]:
+        """Wrap subtitle text and place its lines and backgrounds, once per (text, width, height)."""
+        key = (text, width, height)
+        if key in self._layout_cache:
+            return self._layout_cache[key]
+        
+        font = _load_font(32)
         
         # Wrap text
-        text = subtitle_segment['text']
         words = text.split()
         lines = []
         current_line = ""
         
         for word in words:
             test_line = current_line + " " + word if current_line else word
-            bbox = draw.textbbox((0, 0), test_line, font=font)
+            bbox = font.getbbox(test_line)
             if bbox[2] - bbox[0] < width - 100:
                 current_line = test_line
             else:
@@ -312,28 +386,85 @@ class SubtitleOverlay:
         if current_line:
             lines.append(current_line)
         
-        # Draw subtitle background
-        subtitle_y = height - 150
-        line_height = 40
-        
-        for i, line in enumerate(lines):
-            bbox = draw.textbbox((0, 0), line, font=font)
-            line_width = bbox[2] - bbox[0]
-            line_x = (width - line_width) // 2
+        layout = None
+        if lines:
+            # Lay out subtitle lines and their background rectangles in frame coordinates
+            subtitle_y = height - 150
+            line_height = 40
+            placed = []
+            boxes = []
             
-            # Draw background rectangle
-            bg_rect = [
-                line_x - 20, subtitle_y + i * line_height - 10,
-                line_x + line_width + 20, subtitle_y + i * line_height + 30
-            ]
-            bg_color = (0, 0, 0, int(180 * alpha))
-            draw.rectangle(bg_rect, fill=bg_color)
+            for i, line in enumerate(lines):
+                bbox = font.getbbox(line)
+                line_width = bbox[2] - bbox[0]
+                line_x = (width - line_width) // 2
+                line_y = subtitle_y + i * line_height
+                
+                bg_rect = [
+                    line_x - 20, line_y - 10,
+                    line_x + line_width + 20, line_y + 30
+                ]
+                placed.append((line, line_x, line_y, bg_rect))
+                boxes.append(bg_rect)
+                boxes.append((line_x + bbox[0], line_y + bbox[1], line_x + bbox[2], line_y + bbox[3]))
+            layout = (placed, boxes)
+        
+        self._layout_cache[key] = layout
+        return layout
+    
+    def write_ass(self, subtitle_segments: List[Dict[str, Any]], path: str,
+                  width: int, height: int) -> str:
+        """
+        Write subtitle segments as an ASS script that ffmpeg's libass can burn in at encode time.
+        
+        Lines are wrapped and placed exactly like create_subtitle_layer, with the same
+        0.3s fades, so the burned-in subtitles match the rasterized ones.
+        
+        Args:
+            subtitle_segments: Segments from process_narration
+            path: Where to write the .ass file
+            width: Frame width
+            height: Frame height
             
-            # Draw text
-            text_color = (255, 255, 255, int(255 * alpha))
-            draw.text((line_x, subtitle_y + i * line_height), line, fill=text_color, font=font)
+        Returns:
+            The path that was written
+        """
+        events = []
+        for segment in subtitle_segments:
+            layout = self._subtitle_layout(segment['text'], width, height)
+            if layout is None:
+                continue
+            start = _ass_time(segment['start_time'])
+            end = _ass_time(segment['end_time'])
+            for line, line_x, line_y, _ in layout[0]:
+                # Braces open override blocks in ASS, so keep them out of the text
+                text = line.replace('{', '(').replace('}', ')')
+                events.append(f"Dialogue: 0,{start},{end},Subtitle,,0,0,0,,"
+                              f"{{\\an7\\pos({line_x},{line_y})\\fad(300,300)}}{text}")
         
-        return img
+        # Opaque box (BorderStyle 3) in black at alpha 180, padded like the PIL backgrounds
+        script = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {width}",
+            f"PlayResY: {height}",
+            "WrapStyle: 2",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+            "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+            "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            "Style: Subtitle,Arial,32,&H00FFFFFF,&H00FFFFFF,&H4B000000,&H4B000000,"
+            "0,0,0,0,100,100,0,0,3,10,0,7,0,0,0,1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+            *events,
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(script) + '\n')
+        return path
     
     def create_emoji_overlay(self, subtitle_segment: Dict[str, Any], 
                            width: int, height: int, time: float) -> Optional[Image.Image]:
@@ -349,6 +480,17 @@ class SubtitleOverlay:
         Returns:
             PIL Image with emoji overlay, or None if not needed
         """
+        layer = self.create_emoji_layer(subtitle_segment, width, height, time)
+        return self._layer_to_frame(layer, width, height)
+    
+    def create_emoji_layer(self, subtitle_segment: Dict[str, Any], width: int, height: int,
+                           time: float) -> Optional[Tuple[Image.Image, Tuple[int, int]]]:
+        """
+        Create only the region of the emoji overlay that has content.
+        
+        Returns:
+            (RGBA layer, (x, y) position in the frame), or None if not needed
+        """
         if not PIL_AVAILABLE:
             return None
         
@@ -363,16 +505,9 @@ class SubtitleOverlay:
         if time_in_segment > animation_duration:
             return None
         
-        # Create emoji overlay image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-        except:
-            font = ImageFont.load_default()
-        
         # Animate emojis
+        placed = []
+        boxes = []
         for i, emoji in enumerate(subtitle_segment['emojis']):
             if not emoji:
                 continue
@@ -387,20 +522,71 @@ class SubtitleOverlay:
             # Calculate alpha (fade in)
             alpha = min(1.0, time_in_segment / 0.3)
             
-            # Draw emoji with effects
+            # Emoji position; the glow passes extend it by up to 3px down-right
             emoji_x = int(base_x * scale)
             emoji_y = int(base_y + bounce)
+            mask, bbox = self._emoji_sprite(emoji)
+            placed.append((mask, emoji_x + bbox[0], emoji_y + bbox[1], alpha))
+            boxes.append((emoji_x + bbox[0], emoji_y + bbox[1], emoji_x + bbox[2] + 3, emoji_y + bbox[3] + 3))
+        
+        origin, img = self._new_layer(boxes, width, height)
+        if img is None:
+            return None
+        ox, oy = origin
+        
+        # Each pass paints the emoji's cached coverage mask, exactly as draw.text would
+        for mask, x, y, alpha in placed:
+            if mask is None:
+                continue
+            x -= ox
+            y -= oy
             
             # Draw glow effect
             glow_alpha = int(50 * alpha)
             for offset in range(1, 4):
                 glow_color = (255, 255, 255, glow_alpha // offset)
-                draw.text((emoji_x + offset, emoji_y + offset), emoji, fill=glow_color, font=font)
+                img.paste(glow_color, (x + offset, y + offset, x + offset + mask.width, y + offset + mask.height), mask)
             
             # Draw main emoji
             emoji_color = (255, 255, 255, int(255 * alpha))
-            draw.text((emoji_x, emoji_y), emoji, fill=emoji_color, font=font)
+            img.paste(emoji_color, (x, y, x + mask.width, y + mask.height), mask)
         
+        return img, origin
+    
+    def _emoji_sprite(self, emoji: str) -> Tuple[Optional[Image.Image], Tuple[int, int, int, int]]:
+        """Rasterize an emoji once into an L coverage mask, returned with its font bbox."""
+        sprite = self._emoji_sprites.get(emoji)
+        if sprite is None:
+            font = _load_font(48)
+            bbox = font.getbbox(emoji)
+            mask = None
+            if bbox[2] > bbox[0] and bbox[3] > bbox[1]:
+                mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+                ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), emoji, fill=255, font=font)
+            sprite = (mask, bbox)
+            self._emoji_sprites[emoji] = sprite
+        return sprite
+    
+    def _new_layer(self, boxes: List[Tuple[int, int, int, int]], width: int,
+                   height: int) -> Tuple[Tuple[int, int], Optional[Image.Image]]:
+        """Allocate a transparent layer covering the union of boxes, clipped to the frame."""
+        if not boxes:
+            return (0, 0), None
+        x0 = max(0, int(min(b[0] for b in boxes)))
+        y0 = max(0, int(min(b[1] for b in boxes)))
+        x1 = min(width, int(max(b[2] for b in boxes)) + 1)
+        y1 = min(height, int(max(b[3] for b in boxes)) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return (0, 0), None
+        return (x0, y0), Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+    
+    def _layer_to_frame(self, layer: Optional[Tuple[Image.Image, Tuple[int, int]]],
+                        width: int, height: int) -> Optional[Image.Image]:
+        """Place a tight layer onto a full-size transparent frame."""
+        if layer is None:
+            return None
+        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        img.paste(layer[0], layer[1])
         return img
     
     def get_next_position(self):
@@ -197,6 +197,125 @@ def test_file_structure():
     return all_exist
 
 
+def test_fast_engaging_kernel():
+    """Test that the Numba frame kernel matches the PIL drawing path."""
+    print("\n🧪 Testing FastEngagingVideoRenderer kernel...")
+    
+    import random
+    import fast_engaging_renderer
+    
+    if not fast_engaging_renderer.NUMBA_AVAILABLE:
+        print("⚠️  numba not installed, skipping kernel comparison")
+        return True
+    
+    explanation = {'title': 'Test', 'overview': 'A small test', 'key_takeaways': ['Done']}
+    renderer = fast_engaging_renderer.FastEngagingVideoRenderer(640, 480, 10)
+    random.seed(7)
+    renderer._init_particles()
+    # Particles clipped by the frame edges
+    renderer.particles[0]['x'] = 0
+    renderer.particles[1]['y'] = 479
+    
+    frames = []
+    try:
+        for numba_on in (True, False):
+            fast_engaging_renderer.NUMBA_AVAILABLE = numba_on
+            random.seed(11)
+            renderer._section = None
+            frames.append([
+                renderer._create_animated_frame("def f():\n    return 1", explanation,
+                                                progress, progress * 10, 0).tobytes()
+                for progress in (0.1, 0.3, 0.5, 0.8, 0.95)
+            ])
+    finally:
+        fast_engaging_renderer.NUMBA_AVAILABLE = True
+    
+    assert frames[0] == frames[1], "Numba and PIL frames differ"
+    print("✅ Numba and PIL paths render identical frames")
+    return True
+
+
+def test_tts_cache():
+    """Test the on-disk narration cache with a stand-in synthesis engine."""
+    print("\n🧪 Testing TextToSpeech cache...")
+    
+    import tempfile
+    from text_to_speech import TextToSpeech
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Bypass engine setup; only the cache wrapper around synthesis is under test
+        tts = TextToSpeech.__new__(TextToSpeech)
+        tts.engine = "pyttsx3"
+        tts.cache_dir = Path(tmp) / "cache"
+        calls = []
+        
+        def fake_synthesis(text, output_path, voice, speed):
+            calls.append((text, voice))
+            # Fixed-size audio keeps the eviction arithmetic simple
+            Path(output_path).write_bytes(f"{voice}:{text}".encode().ljust(100))
+            return output_path
+        tts._generate_pyttsx3 = fake_synthesis
+        
+        first = os.path.join(tmp, "first.wav")
+        second = os.path.join(tmp, "second.wav")
+        tts.generate_speech("Hello world", first)
+        tts.generate_speech("Hello world", second)
+        assert len(calls) == 1, "cache hit should skip synthesis"
+        assert Path(second).read_bytes().rstrip() == b"default:Hello world"
+        print("✅ Cache hit skips synthesis")
+        
+        tts.generate_speech("Hello world", second, voice="male")
+        tts.generate_speech("Hello there", second)
+        assert len(calls) == 3, "a different voice or text should miss the cache"
+        print("✅ Changed voice or text misses the cache")
+        
+        # Age the entries so their order is unambiguous, then shrink the cap
+        entries = sorted(tts.cache_dir.iterdir())
+        assert len(entries) == 3
+        for age, entry in enumerate(entries):
+            os.utime(entry, (1000 + age, 1000 + age))
+        tts.CACHE_MAX_BYTES = 300
+        tts.generate_speech("Something new", second)
+        remaining = set(tts.cache_dir.iterdir())
+        assert entries[0] not in remaining, "oldest entry should be evicted first"
+        assert set(entries[1:]) <= remaining
+        assert len(remaining) == 3
+        print("✅ Eviction removes the oldest files first")
+    
+    return True
+
+
+def test_interp_indices():
+    """Test that key-frame selection matches the original progress <= bound thresholds."""
+    print("\n🧪 Testing key-frame index mapping...")
+    
+    import numpy as np
+    from _renderer_kernels import interp_indices
+    
+    bounds = [0.25, 0.5, 0.75]
+    
+    def threshold_index(progress):
+        # The step function LightweightVideoRenderer used before vectorizing
+        if progress <= 0.25:
+            return 0
+        elif progress <= 0.5:
+            return 1
+        elif progress <= 0.75:
+            return 2
+        return 3
+    
+    # Counts where progress lands exactly on a bound (60 frames hits 15/60 == 0.25),
+    # plus counts where float rounding puts a progress right beside one
+    for n in [2, 3, 4, 5, 9, 60, 61, 121, 365, 373, 729, 1457] + list(range(2, 200)):
+        expected = [threshold_index(i / (n - 1)) for i in range(n)]
+        actual = [int(i) for i in interp_indices(n, np.array(bounds))]
+        assert actual == expected, f"key-frame indices differ for {n} frames"
+    
+    assert [int(i) for i in interp_indices(1, np.array(bounds))] == [0]
+    print("✅ interp_indices matches the threshold loop at every boundary")
+    return True
+
+
 def main():
     """Run all tests."""
     print("🎬 Code2Vid Test Suite")
@@ -209,7 +328,10 @@ def main():
         ("CodeExplainer", test_explainer),
         ("TextToSpeech", test_tts),
         ("VideoRenderer", test_video_renderer),
-        ("Code2Vid Orchestrator", test_code2vid)
+        ("Code2Vid Orchestrator", test_code2vid),
+        ("FastEngaging Kernel", test_fast_engaging_kernel),
+        ("TTS Cache", test_tts_cache),
+        ("Key-Frame Indices", test_interp_indices)
     ]
     
     results = []
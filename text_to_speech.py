@@ -4,7 +4,11 @@ Converts text explanations to audio using various TTS engines.
 """
 
 import os
+import re
+import hashlib
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Union
 from pathlib import Path
 import requests
@@ -28,17 +32,36 @@ except (ImportError, NameError):
 class TextToSpeech:
     """Handles text-to-speech conversion using multiple engines."""
     
-    def __init__(self, engine: str = "elevenlabs", api_key: Optional[str] = None):
+    # ElevenLabs clients by API key, shared so every instance reuses one keep-alive connection
+    _elevenlabs_clients = {}
+    
+    ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+    
+    # Sentences synthesized concurrently; requests are network-bound, so threads suffice
+    ELEVENLABS_MAX_CONCURRENT = 3
+    _SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+    
+    # Synthesized audio is cached on disk, oldest-used files evicted past this size
+    CACHE_MAX_BYTES = 200 * 1024 * 1024
+    
+    def __init__(self, engine: str = "elevenlabs", api_key: Optional[str] = None,
+                 cache_dir: Optional[str] = None):
         """
         Initialize the TTS engine.
         
         Args:
             engine: TTS engine to use ('elevenlabs', 'pyttsx3', 'bark')
             api_key: API key for the selected engine
+            cache_dir: Directory for cached audio (default: ~/.cache/code2vid/tts)
         """
         self.engine = engine.lower()
         self.api_key = api_key
         
+        if cache_dir is None:
+            cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            cache_dir = os.path.join(cache_home, "code2vid", "tts")
+        self.cache_dir = Path(cache_dir)
+        
         if self.engine == "elevenlabs":
             if not ELEVENLABS_AVAILABLE:
                 raise ImportError("ElevenLabs not available. Install with: pip install elevenlabs")
@@ -46,8 +69,11 @@ class TextToSpeech:
                 self.api_key = os.getenv("ELEVENLABS_API_KEY")
             if not self.api_key:
                 raise ValueError("ElevenLabs API key required. Set ELEVENLABS_API_KEY environment variable.")
-            # Create ElevenLabs client
-            self.elevenlabs_client = client.ElevenLabs(api_key=self.api_key)
+            # Create (or reuse) the ElevenLabs client; its HTTP connection pool outlives
+            # each request, so later calls skip the TLS handshake
+            if self.api_key not in self._elevenlabs_clients:
+                self._elevenlabs_clients[self.api_key] = client.ElevenLabs(api_key=self.api_key)
+            self.elevenlabs_client = self._elevenlabs_clients[self.api_key]
             
         elif self.engine == "pyttsx3":
             if not PYTTSX3_AVAILABLE:
@@ -100,12 +126,61 @@ class TextToSpeech:
             Path to the generated audio file
         """
         
+        # Identical narration is copied from the on-disk cache instead of re-synthesized
+        cached = self._cache_path(text, output_path, voice, speed)
+        if cached.exists():
+            try:
+                shutil.copyfile(cached, output_path)
+                os.utime(cached)  # Mark as recently used for eviction
+                return output_path
+            except OSError:
+                pass
+        
         if self.engine == "elevenlabs":
-            return self._generate_elevenlabs(text, output_path, voice, speed)
+            result = self._generate_elevenlabs(text, output_path, voice, speed)
         elif self.engine == "pyttsx3":
-            return self._generate_pyttsx3(text, output_path, voice, speed)
+            result = self._generate_pyttsx3(text, output_path, voice, speed)
         else:
             raise ValueError(f"Unsupported engine: {self.engine}")
+        
+        # Fallbacks may write a different format elsewhere; only cache the requested file
+        if result == output_path:
+            self._store_in_cache(output_path, cached)
+        return result
+    
+    def _cache_key(self, text: str, voice: str, speed: float) -> str:
+        """Content hash of everything that affects the synthesized audio."""
+        model_id = self.ELEVENLABS_MODEL_ID if self.engine == "elevenlabs" else ""
+        payload = json.dumps([self.engine, voice, speed, model_id, text])
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _cache_path(self, text: str, output_path: str, voice: str, speed: float) -> Path:
+        """Location of the cached audio for this request."""
+        return self.cache_dir / (self._cache_key(text, voice, speed) + Path(output_path).suffix)
+    
+    def _store_in_cache(self, audio_path: str, cached: Path):
+        """Copy fresh audio into the cache atomically, then evict the least recently used files."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                shutil.copyfile(audio_path, temp_path)
+                os.replace(temp_path, cached)
+            except OSError:
+                os.remove(temp_path)
+                raise
+            
+            entries = [(entry.stat(), entry) for entry in self.cache_dir.iterdir()
+                       if entry.is_file() and entry.suffix != '.tmp']
+            total = sum(st.st_size for st, _ in entries)
+            for st, entry in sorted(entries, key=lambda item: item[0].st_mtime):
+                if total <= self.CACHE_MAX_BYTES:
+                    break
+                entry.unlink()
+                total -= st.st_size
+        except OSError as e:
+            print(f"TTS cache write failed: {e}")
     
     def _generate_elevenlabs(self, text: str, output_path: str, voice: str, speed: float) -> str:
         """Generate speech using ElevenLabs."""
@@ -121,23 +196,42 @@ class TextToSpeech:
             
             voice_id = available_voices.get(voice, available_voices["default"])
             
-            # Generate audio using the new client-based API
-            audio_stream = self.elevenlabs_client.text_to_speech.convert(
-                voice_id=voice_id,
-                text=text,
-                model_id="eleven_monolingual_v1"
-            )
+            sentences = [s for s in self._SENTENCE_BREAK_RE.split(text.strip()) if s]
+            if len(sentences) < 2:
+                # Save to file as chunks arrive - handle the generator response
+                with open(output_path, 'wb') as f:
+                    for chunk in self._stream_elevenlabs(text, voice_id):
+                        f.write(chunk)
+                return output_path
             
-            # Save to file - handle the generator response
-            with open(output_path, 'wb') as f:
-                for chunk in audio_stream:
-                    f.write(chunk)
+            # Synthesize sentences concurrently; map yields results in submission order,
+            # so the audio is written back in narration order whatever finishes first
+            workers = min(self.ELEVENLABS_MAX_CONCURRENT, len(sentences))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parts = executor.map(lambda sentence: b''.join(self._stream_elevenlabs(sentence, voice_id)),
+                                     sentences)
+                with open(output_path, 'wb') as f:
+                    for audio in parts:
+                        f.write(audio)
             
             return output_path
             
         except Exception as e:
             raise Exception(f"ElevenLabs TTS failed: {str(e)}")
     
+    def _stream_elevenlabs(self, text: str, voice_id: str):
+        """Yield audio chunks for text from the ElevenLabs streaming endpoint."""
+        # 'stream' in SDK v2, 'convert_as_stream' before; latency optimizations make
+        # audio start arriving before synthesis finishes
+        tts_api = self.elevenlabs_client.text_to_speech
+        stream = getattr(tts_api, 'stream', None) or tts_api.convert_as_stream
+        return stream(
+            voice_id=voice_id,
+            text=text,
+            model_id=self.ELEVENLABS_MODEL_ID,
+            optimize_streaming_latency=3
+        )
+    
     def _generate_pyttsx3(self, text: str, output_path: str, voice: str, speed: float) -> str:
         """Generate speech using pyttsx3 or system TTS fallback."""
         try:
@@ -1,7 +1,10 @@
 import os
 import json
 import math
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 from dataclasses import dataclass
@@ -317,6 +320,34 @@ class TypewriterAvatarRenderer:
         
         return img
     
+    def _generate_frames(self, lines: List[LineData], total_frames: int) -> Iterator[bytes]:
+        """Render frames as raw RGBA bytes, in order, spread across cores when worthwhile."""
+        next_frame = 0
+        
+        # Frames only depend on their time and the lines, so render them in parallel
+        workers = min(os.cpu_count() or 1, max(1, total_frames // 16))
+        if workers > 1:
+            try:
+                job = {'size': (self.width, self.height, self.fps), 'lines': lines}
+                with ProcessPoolExecutor(max_workers=workers, initializer=_typewriter_worker_init,
+                                         initargs=(job,)) as executor:
+                    # Keep a bounded window in flight so finished frames don't pile up ahead of ffmpeg
+                    pending = deque()
+                    submitted = 0
+                    while next_frame < total_frames:
+                        while submitted < total_frames and len(pending) < workers * 4:
+                            pending.append(executor.submit(_typewriter_render_one, submitted))
+                            submitted += 1
+                        frame_bytes = pending.popleft().result()
+                        next_frame += 1
+                        yield frame_bytes
+                return
+            except (OSError, BrokenProcessPool) as e:
+                print(f"Parallel frame rendering failed ({e}), rendering serially")
+        
+        for frame_idx in range(next_frame, total_frames):
+            yield self.render_frame(frame_idx * self.frame_duration, lines).tobytes()
+    
     def create_video(self, audio_file: str, text: str, output_file: str = "typewriter_video.mp4"):
         """Create the complete typewriter-style video"""
         print("Extracting word timings...")
@@ -335,50 +366,65 @@ class TypewriterAvatarRenderer:
         
         print(f"Creating video: {total_frames} frames at {self.fps} FPS")
         
-        # Create temporary directory for frames
-        os.makedirs("temp_frames", exist_ok=True)
-        
-        # Generate frames
-        for frame_idx in range(total_frames):
-            time = frame_idx * self.frame_duration
-            
-            # Render frame
-            frame = self.render_frame(time, lines)
-            
-            # Save frame
-            frame_path = f"temp_frames/frame_{frame_idx:06d}.png"
-            frame.save(frame_path)
-            
-            if frame_idx % 30 == 0:
-                print(f"Generated frame {frame_idx}/{total_frames}")
-        
-        # Combine with audio using ffmpeg
-        print("Combining frames with audio...")
+        # Stream raw RGBA frames into ffmpeg, which muxes in the audio as it encodes
         import subprocess
         
         cmd = [
             "ffmpeg", "-y",
-            "-framerate", str(self.fps),
-            "-i", "temp_frames/frame_%06d.png",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgba",
+            "-s", f"{self.width}x{self.height}",
+            "-r", str(self.fps),
+            "-i", "-",
             "-i", audio_file,
             "-c:v", "libx264",
             "-preset", "medium",
             "-crf", "23",
+            "-pix_fmt", "yuv420p",
             "-c:a", "aac",
             "-b:a", "128k",
             "-shortest",
             output_file
         ]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, bufsize=1 << 20)
         
-        subprocess.run(cmd, check=True)
+        # Generate frames
+        try:
+            for frame_idx, frame_bytes in enumerate(self._generate_frames(lines, total_frames)):
+                # Send frame
+                proc.stdin.write(frame_bytes)
+                
+                if frame_idx % 30 == 0:
+                    print(f"Generated frame {frame_idx}/{total_frames}")
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code is checked below
+        finally:
+            proc.stdin.close()
         
-        # Clean up
-        import shutil
-        shutil.rmtree("temp_frames")
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
         
         print(f"Video created: {output_file}")
         return output_file
 
+# Per-process state for parallel frame rendering
+_typewriter_worker = None
+_typewriter_lines = None
+
+
+def _typewriter_worker_init(job: Dict):
+    """Build a renderer once per worker process."""
+    global _typewriter_worker, _typewriter_lines
+    _typewriter_worker = TypewriterAvatarRenderer(*job['size'])
+    _typewriter_lines = job['lines']
+
+
+def _typewriter_render_one(frame_idx: int) -> bytes:
+    """Render a single frame inside a worker process."""
+    return _typewriter_worker.render_frame(frame_idx * _typewriter_worker.frame_duration,
+                                           _typewriter_lines).tobytes()
+
+
 # Example usage
 if __name__ == "__main__":
     renderer = TypewriterAvatarRenderer()